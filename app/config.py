@@ -11,10 +11,12 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 1440  # 24 hours (60 * 24)
     REFRESH_TOKEN_EXPIRE_DAYS: int = 30  # Refresh token valid for 30 days
+    BCRYPT_ROUNDS: int = 10  # Cost for new hashes (existing hashes verify at their own cost)
 
     # Server configuration
     HOST: str = "0.0.0.0"
     PORT: int = 8000
+    WEB_CONCURRENCY: int = 1  # uvicorn worker processes (exported by uvicorn_config.py)
 
     # Logging configuration
     LOG_LEVEL: str = "INFO"
@@ -36,6 +38,16 @@ class Settings(BaseSettings):
     AWS_SECRET_ACCESS_KEY: str = ""
     AWS_REGION: str = ""
     AWS_BUCKET_NAME: str = ""
+    S3_PRESIGNED_URL_EXPIRE_SECONDS: int = 604800  # 7 days (SigV4 maximum)
+    S3_MAX_POOL_CONNECTIONS: int = 100  # Keep >= IMAGE_FETCH_CONCURRENCY used for parallel S3 fetches
+    S3_UPLOAD_CONCURRENCY: int = 16  # Parallel S3 image uploads during PDF extraction
+    
+    # Upload limits
+    MAX_UPLOAD_SIZE_BYTES: int = 200 * 1024 * 1024  # 200 MB per upload request
+    
+    # PDF extraction processes per uvicorn worker (0 = auto: cpu count // WEB_CONCURRENCY, at least 1)
+    PDF_EXTRACT_WORKERS: int = 0
+    PDF_EXTRACTOR_BACKEND: str = "pdfplumber"  # "pymupdf" for the faster MuPDF backend (needs pymupdf)
     
     # MongoDB configuration
     MONGODB_URI: str = ""
@@ -43,6 +55,15 @@ class Settings(BaseSettings):
     MONGODB_USER_COLLECTION: str = "user_data"
     MONGODB_PROPERTY_COLLECTION: str = "property_data"
     MONGODB_CHAT_COLLECTION: str = "chat_history"
+    MONGODB_MAX_POOL_SIZE: int = 200
+    MONGODB_MIN_POOL_SIZE: int = 10
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS: int = 3000  # Fail fast instead of the 30s driver default
+    MONGODB_CONNECT_TIMEOUT_MS: int = 3000
+    MONGODB_SOCKET_TIMEOUT_MS: int = 10000
+    MONGODB_MAX_IDLE_TIME_MS: int = 300000  # Recycle idle pooled connections after 5 minutes
+    MONGODB_WAIT_QUEUE_TIMEOUT_MS: int = 2000  # Fail fast when the pool is exhausted
+    MONGODB_STARTUP_PING: bool = True  # Disable for tests / cold-start sensitive deployments
+    MONGODB_COMPRESSORS: str = "zstd,zlib"  # Negotiated with the server; zstd needs pymongo[zstd]
 
 
     class Config:
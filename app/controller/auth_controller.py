@@ -3,6 +3,7 @@ Authentication Controller - Register, Login, Refresh, Logout.
 """
 
 from fastapi import APIRouter, Response, Request, Depends, Cookie
+from starlette.concurrency import run_in_threadpool
 from datetime import timedelta, datetime
 from typing import Optional
 import uuid
@@ -11,7 +12,7 @@ from loguru import logger
 from app.utils.response import error_response, success_response
 from app.model.auth_model import UserLogin, UserRegister, UserResponse, TokenResponse, RefreshTokenRequest
 from app.services.mongo_service import get_mongo_service, MongoService
-from app.services.security import verify_password, get_password_hash, generate_opaque_token, get_token_hash
+from app.services.security import verify_password, get_password_hash, generate_opaque_token, get_token_hash, get_token_hash_candidates, token_hash_matches
 from app.services.token import JWTAuth
 from app.config import settings
 
@@ -24,7 +25,7 @@ async def register(request: UserRegister, mongo: MongoService = Depends(get_mong
     """Register a new user."""
     logger.info(f"Received registration request for email: {request.email}")
     try:
-        users_collection = await mongo.get_users_collection()
+        users_collection = mongo.users
         if users_collection is None:
             logger.error("Users collection is None. Database connection might have failed.")
             return error_response("Database service unavailable", 503)
@@ -41,7 +42,7 @@ async def register(request: UserRegister, mongo: MongoService = Depends(get_mong
         logger.info("Hashing password...")
         # Create user
         try:
-            hashed_pw = get_password_hash(request.password)
+            hashed_pw = await run_in_threadpool(get_password_hash, request.password)
             logger.info("Password hashed successfully")
         except Exception as e:
             logger.error(f"Password hashing failed: {e}")
@@ -70,14 +71,14 @@ async def register(request: UserRegister, mongo: MongoService = Depends(get_mong
 async def login(response: Response, request: UserLogin, mongo: MongoService = Depends(get_mongo_service)):
     """Login and issue access/refresh tokens."""
     try:
-        users_collection = await mongo.get_users_collection()
+        users_collection = mongo.users
         user = await users_collection.find_one({"email": request.email})
         
         if not user:
             logger.warning(f"Login failed: User not found for email {request.email}")
             return error_response("You haven't signed up. Please sign up first.", 401)
             
-        if not verify_password(request.password, user["hashed_password"]):
+        if not await run_in_threadpool(verify_password, request.password, user["hashed_password"]):
             logger.warning(f"Login failed: Invalid password for user {request.email}")
             return error_response("Invalid email or password", 401)
             
@@ -152,11 +153,11 @@ async def refresh_token(
         return error_response("Refresh token missing", 401)
         
     try:
-        token_hash = get_token_hash(refresh_token)
-        users_col = await mongo.get_users_collection()
+        token_hashes = get_token_hash_candidates(refresh_token)
+        users_col = mongo.users
         
-        # Find user with this token
-        user = await users_col.find_one({"refresh_tokens.token_hash": token_hash})
+        # Find user with this token (binary digest, or legacy hex hash)
+        user = await users_col.find_one({"refresh_tokens.token_hash": {"$in": token_hashes}})
         
         if not user:
             # Token not found in any user (possibly rotated/deleted)
@@ -165,7 +166,7 @@ async def refresh_token(
             return error_response("Invalid refresh token", 401)
             
         # Find the specific token object in the list
-        stored_token = next((t for t in user.get("refresh_tokens", []) if t["token_hash"] == token_hash), None)
+        stored_token = next((t for t in user.get("refresh_tokens", []) if token_hash_matches(t["token_hash"], token_hashes)), None)
         
         if not stored_token:
             # Should not happen if query matched
@@ -186,7 +187,7 @@ async def refresh_token(
         
         # 1. Revoke old token
         await users_col.update_one(
-            {"_id": user["_id"], "refresh_tokens.token_hash": token_hash},
+            {"_id": user["_id"], "refresh_tokens.token_hash": stored_token["token_hash"]},
             {"$set": {"refresh_tokens.$.revoked": True}}
         )
         
@@ -249,12 +250,12 @@ async def logout(
     
     if refresh_token:
         try:
-            token_hash = get_token_hash(refresh_token)
-            users_col = await mongo.get_users_collection()
+            token_hashes = get_token_hash_candidates(refresh_token)
+            users_col = mongo.users
             
             # Revoke token in user's list
             await users_col.update_one(
-                {"refresh_tokens.token_hash": token_hash},
+                {"refresh_tokens.token_hash": {"$in": token_hashes}},
                 {"$set": {"refresh_tokens.$.revoked": True}}
             )
         except Exception:
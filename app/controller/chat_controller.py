@@ -2,24 +2,80 @@
 Chat Controller - Image regeneration endpoint.
 """
 
+import re
+import msgspec
 from fastapi import APIRouter, Depends, Request, Body
+from fastapi.exceptions import RequestValidationError
 from loguru import logger
 from datetime import datetime
 from app.model.doc_model import PropertyData
 from app.model.chat_model import ChatMessage
 from app.utils.response import success_response, error_response
-from app.model.chat_model import ChatRequest, ChatResponse, RegeneratedImage, ChatHistory
+from app.model.chat_model import ChatRequest, ChatRequestStruct, ChatResponse, RegeneratedImage, ChatHistory
 from app.llm.openai_client import get_openai_client
 from app.services.mongo_service import get_mongo_service, MongoService
 
 
 router = APIRouter()
 
+_chat_request_decoder = msgspec.json.Decoder(ChatRequestStruct)
 
-@router.post("/regenerate", response_model=ChatResponse)
+# "Object missing required field `user_feedback`" / "... - at `$.image_ids[0]`"
+_MISSING_FIELD_RE = re.compile(r"missing required field `([^`]+)`")
+_PATH_PART_RE = re.compile(r"\.([^.\[]+)|\[(\d+)\]")
+
+
+def _validation_error_detail(error: msgspec.ValidationError) -> dict:
+    """Translate a msgspec ValidationError into a pydantic-style error dict."""
+    msg, _, path = str(error).partition(" - at `$")
+    loc = ["body"]
+    for key, index in _PATH_PART_RE.findall(path.rstrip("`")):
+        loc.append(key if key else int(index))
+
+    missing = _MISSING_FIELD_RE.search(msg)
+    if missing:
+        loc.append(missing.group(1))
+        return {"loc": tuple(loc), "msg": "Field required", "type": "missing"}
+
+    return {"loc": tuple(loc), "msg": msg, "type": "value_error"}
+
+
+async def parse_chat_request(request: Request) -> ChatRequest:
+    """
+    Decode and validate the ChatRequest body with msgspec.
+
+    Skips FastAPI's pydantic body validation; on failure only the first
+    error is reported, translated to the loc/msg shape the global validation
+    handler expects (e.g. "user_feedback field required").
+    """
+    try:
+        body = _chat_request_decoder.decode(await request.body())
+    except msgspec.ValidationError as e:
+        raise RequestValidationError([_validation_error_detail(e)])
+    except msgspec.DecodeError:
+        raise RequestValidationError([{"loc": ("body",), "msg": "JSON decode error", "type": "json_invalid"}])
+
+    return ChatRequest.model_construct(
+        property_id=body.property_id,
+        image_ids=body.image_ids,
+        user_feedback=body.user_feedback,
+    )
+
+
+@router.post(
+    "/regenerate",
+    response_model=ChatResponse,
+    # Body is parsed by parse_chat_request, so document the schema explicitly
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": ChatRequest.model_json_schema()}},
+        }
+    },
+)
 async def regenerate_images(
-    request_body: ChatRequest,
     request: Request,
+    request_body: ChatRequest = Depends(parse_chat_request),
     mongo: MongoService = Depends(get_mongo_service)
 ):
     """
@@ -60,7 +116,7 @@ async def regenerate_images(
     logger.debug(f"User Feedback: {request_body.user_feedback}")
 
     # Check property ownership
-    property_col = await mongo.get_property_data_collection()
+    property_col = mongo.property_data
     
     property_doc = await property_col.find_one({
         "property_id": property_id,
@@ -130,9 +186,9 @@ async def regenerate_images(
         if result.get("error"):
             return error_response(f"Image regeneration failed: {result['error']}", 500)
         
-        # Build response with URLs
+        # Build response with URLs (trusted client/S3 output, constructed without re-validation)
         regenerated = [
-            RegeneratedImage(
+            RegeneratedImage.model_construct(
                 url=img.get("url", ""),
                 mime_type=img.get("mime_type", "image/png")
             )
@@ -140,7 +196,7 @@ async def regenerate_images(
             if img.get("url")
         ]
         
-        response = ChatResponse(
+        response = ChatResponse.model_construct(
             regenerated_images=regenerated,
             description=result.get("description", ""),
             input_count=result.get("input_count", len(image_urls)),
@@ -149,19 +205,19 @@ async def regenerate_images(
         
         # Save Chat History (Async)
 
-        chat_entry = ChatMessage(
+        chat_entry = ChatMessage.model_construct(
             role="user",
             content=request_body.user_feedback,
             image_ids=request_body.image_ids
         )
         
-        response_entry = ChatMessage(
+        response_entry = ChatMessage.model_construct(
             role="assistant",
             images=regenerated,
             description=result.get("description", "")
         )
         
-        chat_col = await mongo.get_chat_collection()
+        chat_col = mongo.chat
         
         # Update shared chat history document for this property
         await chat_col.update_one(
@@ -194,7 +250,7 @@ async def get_chat_history(
     logger.info(f"Fetching chat history for property: {property_id}")
 
     try:
-        chat_col = await mongo.get_chat_collection()
+        chat_col = mongo.chat
         chat_doc = await chat_col.find_one({"property_id": property_id})
         
         if not chat_doc:
@@ -3,24 +3,73 @@ Document Controller - PDF upload, image extraction, and property management.
 """
 
 from pathlib import Path
-from typing import List, Optional
-from datetime import datetime
-from fastapi import APIRouter, UploadFile, File, Form, Depends, Request, HTTPException, Body
+from typing import List
+from datetime import datetime, timezone
+from fastapi import APIRouter, UploadFile, File, Form, Depends, Request, Body
 from loguru import logger
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from fastapi.responses import StreamingResponse
 from starlette.concurrency import run_in_threadpool
+import os
+import tempfile
 import uuid
+import orjson
+import asyncio
 from app.utils.response import success_response, error_response
-from app.model.doc_model import (
-    PDFUploadResponse, ExtractedImage, PropertyData, ProjectSummary,
-    PropertyDataResponse, ExtractedImageResponse
+from app.model.doc_model import PDFUploadResponse, ExtractedImage, FileGroup, FilesStructure, ProjectSummary
+from app.services.pdf_extractor import (
+    get_pdf_extractor,
+    PDFExtractor,
+    PDF_PAGES_PER_TASK,
+    page_blocks,
+    count_pages_in_worker,
+    extract_images_in_worker,
 )
-from app.services.pdf_extractor import get_pdf_extractor, PDFExtractor
 from app.services.s3_service import get_s3_service, S3Service
 from app.services.mongo_service import get_mongo_service, MongoService
-from app.model.doc_model import FileGroup, FilesStructure
 
 router = APIRouter()
 
+PDF_MAGIC = b"%PDF-"
+
+
+def _write_temp_pdf(pdf_bytes: bytes) -> str:
+    """Write PDF bytes to a temp file and return its path (caller deletes it)."""
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+        tmp.write(pdf_bytes)
+        return tmp.name
+
+
+async def _extract_in_pool(pdf_pool, pdf_bytes: bytes, filename: str, folder: str) -> dict:
+    """
+    Extract images from one PDF using the process pool, spreading blocks of pages across workers.
+    
+    The bytes are written once to a temp file and workers get only its path plus a page
+    range, so the PDF isn't pickled over IPC per task. Image order and per-page
+    filenames match a single-pass extraction.
+    """
+    loop = asyncio.get_running_loop()
+    pdf_path = await run_in_threadpool(_write_temp_pdf, pdf_bytes)
+    try:
+        total_pages = await loop.run_in_executor(pdf_pool, count_pages_in_worker, pdf_path)
+        
+        if total_pages <= PDF_PAGES_PER_TASK:
+            return await loop.run_in_executor(pdf_pool, extract_images_in_worker, pdf_path, filename, folder)
+        
+        block_results = await asyncio.gather(*(
+            loop.run_in_executor(pdf_pool, extract_images_in_worker, pdf_path, filename, folder, pages)
+            for pages in page_blocks(total_pages)
+        ))
+        return {
+            "pdf_filename": filename,
+            "total_pages": total_pages,
+            "images": [img for result in block_results for img in result["images"]]
+        }
+    finally:
+        await run_in_threadpool(os.unlink, pdf_path)
+
+
 @router.post("/upload", response_model=PDFUploadResponse)
 async def upload_pdfs(
     request: Request,
@@ -60,12 +109,18 @@ async def upload_pdfs(
     for file, _ in files_to_process:
         if not file.filename:
             continue
-        if not file.filename.lower().endswith('.pdf'):
+        # Peek at the magic bytes instead of trusting the extension
+        header = await file.read(5)
+        await file.seek(0)
+        if header != PDF_MAGIC:
             logger.warning(f"Upload rejected: Non-PDF file detected - {file.filename}")
             return error_response(f"Only PDF files are allowed. Got: {file.filename}", 400)
     
     logger.info(f"File validation passed. Processing {len(mls_files) if mls_files else 0} MLS files and {len(comps_files) if comps_files else 0} COMPS files.")
     
+    # Single timestamp for the whole request
+    now = datetime.now(timezone.utc)
+    
     new_mls_images = []
     new_comps_images = []
     mls_urls = []
@@ -76,17 +131,17 @@ async def upload_pdfs(
     total_files = 0
     
     try:
-        for file, category in files_to_process:
-            if not file.filename:
-                continue
+        files_to_process = [(f, category) for f, category in files_to_process if f.filename]
+        
+        # Step 1: Read all file contents concurrently (overlaps spooled-file disk reads)
+        file_contents = await asyncio.gather(*(f.read() for f, _ in files_to_process))
+        
+        for (file, category), file_content in zip(files_to_process, file_contents):
             filename = file.filename
             total_files += 1
             logger.info(f"Processing {category.upper()} PDF: {filename}")
             
             try:
-                # Step 1: Read file content
-                file_content = await file.read()
-                
                 # Step 2: Upload PDF to S3
                 pdf_s3_result = await run_in_threadpool(
                     s3.upload_file_to_s3,
@@ -107,13 +162,18 @@ async def upload_pdfs(
                 else:
                     comps_urls.append(pdf_url)
                 
-                # Step 3: Extract images
-                extraction_result = await run_in_threadpool(
-                    pdf_extractor.extract_images_from_bytes,
-                    pdf_bytes=file_content,
-                    pdf_filename=filename,
-                    folder=f"extracted/{property_id}/{category}/{Path(filename).stem}"
-                )
+                # Step 3: Extract images (CPU-bound, run in the process pool when available)
+                extract_folder = f"extracted/{property_id}/{category}/{Path(filename).stem}"
+                pdf_pool = getattr(request.app.state, "pdf_pool", None)
+                if pdf_pool is not None:
+                    extraction_result = await _extract_in_pool(pdf_pool, file_content, filename, extract_folder)
+                else:
+                    extraction_result = await run_in_threadpool(
+                        pdf_extractor.extract_images_from_bytes,
+                        pdf_bytes=file_content,
+                        pdf_filename=filename,
+                        folder=extract_folder
+                    )
                 
                 if category == "mls":
                     mls_total_pages += extraction_result.get('total_pages', 0)
@@ -128,19 +188,20 @@ async def upload_pdfs(
                     # Set category from caption if available, else 'unknown'
                     img_category = caption if caption else "unknown"
                     
-                    image_model = ExtractedImage(
-                        id=image_id,
-                        filename=f"{filename}_{img['filename']}",
-                        page=img['page'],
-                        url=img['url'],
-                        mime_type=img.get('mime_type', 'image/png'),
-                        category=img_category
-                    )
+                    # Plain dict (trusted extractor output) - persisted as-is, no model_dump needed
+                    image_doc = {
+                        "id": image_id,
+                        "filename": f"{filename}_{img['filename']}",
+                        "page": img['page'],
+                        "url": img['url'],
+                        "mime_type": img.get('mime_type', 'image/png'),
+                        "category": img_category
+                    }
                     
                     if category == "mls":
-                        new_mls_images.append(image_model)
+                        new_mls_images.append(image_doc)
                     else:
-                        new_comps_images.append(image_model)
+                        new_comps_images.append(image_doc)
                 
             except Exception as e:
                 logger.error(f"Error processing PDF {filename}: {e}")
@@ -150,107 +211,85 @@ async def upload_pdfs(
         
         # Step 5: Persist Property Data in prop_property_data collection
         
-        property_col = await mongo.get_property_data_collection()
-        
-        # Check if property exists
-        existing_prop = await property_col.find_one({"property_id": property_id})
-        
-        # Prepare data for DB
-        mls_data = {
-            "url": mls_urls,
-            "images": [img.model_dump() for img in new_mls_images],
-            "total_images": len(new_mls_images),
-            "total_pages": mls_total_pages
-        }
-        
-        comps_data = {
-            "url": comps_urls,
-            "images": [img.model_dump() for img in new_comps_images],
-            "total_images": len(new_comps_images),
-            "total_pages": comps_total_pages
+        property_col = mongo.property_data
+        
+        # Single atomic upsert keyed on (property_id, user_id): appends to an existing
+        # property or creates it, with no find-then-write window for concurrent uploads.
+        # A property_id owned by another user fails the filter, and the upsert then
+        # collides with the unique property_id index. The server only retries
+        # duplicate-key upserts when the filter matches the index fields exactly, so
+        # a concurrent first upload by the same user is retried here once: the
+        # document exists by then and matches if the caller owns it.
+        update_ops = {
+            "$push": {
+                "files.mls.url": {"$each": mls_urls},
+                "files.mls.images": {"$each": new_mls_images},
+                "files.comps.url": {"$each": comps_urls},
+                "files.comps.images": {"$each": new_comps_images}
+            },
+            "$inc": {
+                "files.mls.total_images": len(new_mls_images),
+                "files.mls.total_pages": mls_total_pages,
+                "files.comps.total_images": len(new_comps_images),
+                "files.comps.total_pages": comps_total_pages
+            },
+            "$setOnInsert": {"created_at": now}
         }
 
-        if existing_prop:
-            # Check ownership (security)
-            if existing_prop.get("user_id") != user_id: 
-                 return error_response("Property ID exists but belongs to another user", 403)
-
-            # Property exists, append new entries to nested structures
-            # Note: Merging totals logic here is simple addition; ideally we'd need to re-calculate or just increment
-            # For simplicity, we assume we are ADDING to existing strings/lists
-            
-            update_ops = {
-                "$push": {
-                    "files.mls.url": {"$each": mls_urls},
-                    "files.mls.images": {"$each": [img.model_dump() for img in new_mls_images]},
-                    "files.comps.url": {"$each": comps_urls},
-                    "files.comps.images": {"$each": [img.model_dump() for img in new_comps_images]}
-                },
-                "$inc": {
-                    "files.mls.total_images": len(new_mls_images),
-                    "files.mls.total_pages": mls_total_pages,
-                    "files.comps.total_images": len(new_comps_images),
-                    "files.comps.total_pages": comps_total_pages
-                }
-            }
-
-            result = await property_col.update_one(
-                {"property_id": property_id},
-                update_ops
-            )
-            logger.info(f"Updated property {property_id}: modified={result.modified_count}")
-        
-            updated_prop = await property_col.find_one({"property_id": property_id})
-            if updated_prop:
-                files_doc = updated_prop.get("files", {})
-                mls_doc = files_doc.get("mls", {})
-                comps_doc = files_doc.get("comps", {})
-                
-                # Overwrite our local tracking vars with DB truth
-                mls_data = mls_doc
-                comps_data = comps_doc
-            
-        else:
-            # Create new property document
-            new_property = {
-                "property_id": property_id,
-                "user_id": user_id, 
-                "files": {
-                    "mls": mls_data,
-                    "comps": comps_data
-                },
-                "created_at": datetime.utcnow()
-            }
-            result = await property_col.insert_one(new_property)
-            logger.info(f"Created new property {property_id} for user {user_id}")
-            
-            # Initialize empty chat history in separate collection
-            chat_col = await mongo.get_chat_collection()
-            await chat_col.update_one(
-                {"property_id": property_id},
-                {"$setOnInsert": {"property_id": property_id, "messages": []}},
-                upsert=True
+        async def upsert_property():
+            return await property_col.find_one_and_update(
+                {"property_id": property_id, "user_id": user_id},
+                update_ops,
+                projection={"_id": 0, "files": 1},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
             )
+
+        try:
+            updated_prop = await upsert_property()
+        except DuplicateKeyError:
+            try:
+                updated_prop = await upsert_property()
+            except DuplicateKeyError:
+                return error_response("Property ID exists but belongs to another user", 403)
+        
+        logger.info(f"Upserted property {property_id} for user {user_id}")
+        
+        # Use DB truth for the response
+        files_doc = updated_prop.get("files", {}) if updated_prop else {}
+        mls_data = files_doc.get("mls", {})
+        comps_data = files_doc.get("comps", {})
+        
+        # Ensure chat history exists in separate collection (idempotent)
+        chat_col = mongo.chat
+        await chat_col.update_one(
+            {"property_id": property_id},
+            {"$setOnInsert": {"property_id": property_id, "messages": []}},
+            upsert=True
+        )
         
         # Construct Response
         
-        # Helper to safely instantiate FileGroup from dict or object
-        def to_file_group(data):
+        # Response data comes from our own extractor and Mongo, so build the
+        # models with model_construct and skip re-validation
+        
+        # Helper to safely build a FileGroup from the stored dict
+        def to_file_group(data) -> FileGroup:
             if isinstance(data, dict):
-                 return FileGroup(
-                     url=data.get("url", []),
-                     images=[ExtractedImage(**img) if isinstance(img, dict) else img for img in data.get("images", [])],
-                     total_images=data.get("total_images", 0),
-                     total_pages=data.get("total_pages", 0)
-                 )
+                 return {
+                     "url": data.get("url", []),
+                     "images": [ExtractedImage.model_construct(**img) if isinstance(img, dict) else img for img in data.get("images", [])],
+                     "total_images": data.get("total_images", 0),
+                     "total_pages": data.get("total_pages", 0)
+                 }
             return data
 
-        response_files = FilesStructure(
-            mls=to_file_group(mls_data),
-            comps=to_file_group(comps_data)
-        )
+        response_files: FilesStructure = {
+            "mls": to_file_group(mls_data),
+            "comps": to_file_group(comps_data)
+        }
         
-        response = PDFUploadResponse(
+        response = PDFUploadResponse.model_construct(
             property_id=property_id,
             user_id=user_id,
             total_files=total_files,
@@ -290,7 +329,7 @@ async def update_image_category(
         return error_response("property_id, image_id, and category are required", 400)
         
     try:
-        property_col = await mongo.get_property_data_collection()
+        property_col = mongo.property_data
         
         # Update image category in property document
         result = await property_col.update_one(
@@ -324,9 +363,44 @@ async def update_image_category(
         logger.error(f"Error updating category: {e}")
         return error_response("Failed to update category", 500)
 
+# Listing only needs counts and a thumbnail, not the full nested image arrays
+PROJECT_LIST_PROJECTION = {
+    "_id": 0,
+    "property_id": 1,
+    "created_at": 1,
+    "files.mls.total_images": 1,
+    "files.comps.total_images": 1,
+    "files.mls.images": {"$slice": 1},
+}
+
+PROJECT_STREAM_BATCH_SIZE = 20
+
+def _project_summary(doc: dict) -> ProjectSummary:
+    """Build a JSON-ready ProjectSummary from a projected property document."""
+    files_data = doc.get("files", {})
+    total_images = 0
+    thumbnail_url = None
+    if isinstance(files_data, dict):
+        mls_data = files_data.get("mls", {})
+        comps_data = files_data.get("comps", {})
+        if isinstance(mls_data, dict):
+            total_images += mls_data.get("total_images", 0)
+            mls_images = mls_data.get("images", [])
+            if mls_images:
+                thumbnail_url = mls_images[0].get("url")
+        if isinstance(comps_data, dict):
+            total_images += comps_data.get("total_images", 0)
+
+    return {
+        "property_id": doc.get("property_id"),
+        "created_at": doc.get("created_at"),
+        "total_images": total_images,
+        "thumbnail_url": thumbnail_url
+    }
+
 @router.get("/project")
 async def get_user_projects(request: Request, mongo: MongoService = Depends(get_mongo_service)):
-    """List all projects for the authenticated user."""
+    """List all projects for the authenticated user (streamed as a JSON array of summaries)."""
     logger.info("Received request to list user projects")
     
     if not hasattr(request.state, "jwt_payload") or not request.state.jwt_payload:
@@ -338,29 +412,54 @@ async def get_user_projects(request: Request, mongo: MongoService = Depends(get_
         return error_response("Invalid user session", 401)
         
     try:
-        property_col = await mongo.get_property_data_collection()
+        property_col = mongo.property_data
         
         # Find all properties for this user
         logger.info(f"Querying projects for user_id: {user_id}")
-        cursor = property_col.find({"user_id": user_id})
-        properties = await cursor.to_list(length=100)
-        
-        logger.info(f"Found {len(properties)} documents for user {user_id}")
-
-        # Convert ObjectId to string if needed (though we use property_id)
-        for p in properties:
-             if "_id" in p:
-                 p["_id"] = str(p["_id"])
-
-        logger.info(f"Retrieved {len(properties)} projects for user {user_id}")
-        return success_response(properties)
+        cursor = property_col.find({"user_id": user_id}, PROJECT_LIST_PROJECTION).batch_size(PROJECT_STREAM_BATCH_SIZE)
+        # find() is lazy: pull the first batch here so query errors still return a 500
+        first_batch = await cursor.to_list(length=PROJECT_STREAM_BATCH_SIZE)
     except Exception as e:
         logger.error(f"Error fetching projects: {e}")
         return error_response("Failed to fetch projects", 500)
 
+    def encode(doc: dict) -> bytes:
+        # Same encoding rules as APIJSONResponse (naive Mongo datetimes are UTC)
+        return orjson.dumps(_project_summary(doc), option=orjson.OPT_NAIVE_UTC)
+
+    async def stream_projects():
+        # Emit each summary as soon as its Mongo batch arrives
+        count = 0
+        yield b"["
+        for doc in first_batch:
+            yield (b"," if count else b"") + encode(doc)
+            count += 1
+        try:
+            async for doc in cursor:
+                yield (b"," if count else b"") + encode(doc)
+                count += 1
+        except Exception as e:
+            # Abort the response rather than closing the array over a truncated list
+            logger.error(f"Error streaming projects for user {user_id}: {e}")
+            raise
+        yield b"]"
+        logger.info(f"Retrieved {count} projects for user {user_id}")
+
+    return StreamingResponse(stream_projects(), media_type="application/json")
+
 @router.get("/property")
-async def get_property_detail(request: Request, property_id: str = Body(..., embed=True), mongo: MongoService = Depends(get_mongo_service)):
-    """Get details for a specific property."""
+async def get_property_detail(
+    request: Request,
+    property_id: str = Body(..., embed=True),
+    mongo: MongoService = Depends(get_mongo_service),
+    s3: S3Service = Depends(get_s3_service)
+):
+    """
+    Get details for a specific property.
+    
+    Image URLs are returned presigned so clients can load them from S3 directly
+    without going through /image.
+    """
     logger.info(f"Received request for property details: {property_id}")
     
     if not hasattr(request.state, "jwt_payload") or not request.state.jwt_payload:
@@ -370,7 +469,7 @@ async def get_property_detail(request: Request, property_id: str = Body(..., emb
     user_id = request.state.jwt_payload.get("user_id")
     
     try:
-        property_col = await mongo.get_property_data_collection()
+        property_col = mongo.property_data
         
         # Find property by ID and User ID
         property_doc = await property_col.find_one({
@@ -385,7 +484,7 @@ async def get_property_detail(request: Request, property_id: str = Body(..., emb
         logger.info(f"Retrieved project {property_id} for user {user_id}")
         
         # Fetch chat history separately
-        chat_col = await mongo.get_chat_collection()
+        chat_col = mongo.chat
         chat_doc = await chat_col.find_one({"property_id": property_id})
         # Use simple list if not found or empty
         chat_history = chat_doc.get("messages", []) if chat_doc else []
@@ -412,7 +511,12 @@ async def get_property_detail(request: Request, property_id: str = Body(..., emb
             
         images = []
         
-        for img in all_files:
+        # Sign the whole batch off the event loop in one threadpool hop
+        signed_urls = await run_in_threadpool(
+            s3.presign_public_urls, [img.get("url") for img in all_files]
+        )
+        
+        for img, signed_url in zip(all_files, signed_urls):
             cat = img.get("category", "unknown")
             if cat == "uncategorized" or cat == "unknown":
                  if img.get("caption"):
@@ -422,7 +526,7 @@ async def get_property_detail(request: Request, property_id: str = Body(..., emb
                 "id": img.get("id"),
                 "filename": img.get("filename"),
                 "page": img.get("page"),
-                "url": img.get("url"),
+                "url": signed_url,
                 "mime_type": img.get("mime_type"),
                 "category": cat
             }
@@ -434,7 +538,6 @@ async def get_property_detail(request: Request, property_id: str = Body(..., emb
             "images": images,
             "pdf_urls": property_doc.get("pdf_urls", []),
             "created_at": property_doc.get("created_at"),
-            "created_at": property_doc.get("created_at"),
             "chat_history": chat_history
         }
         
@@ -446,15 +549,19 @@ async def get_property_detail(request: Request, property_id: str = Body(..., emb
         logger.error(f"Error fetching project {property_id}: {e}")
         return error_response("Failed to fetch project details", 500)
 
-@router.get("/image")
+@router.get("/image", deprecated=True)
 async def get_image(request: Request, image_id: str = Body(..., embed=True), mongo: MongoService = Depends(get_mongo_service)):
-    """Serve an image by ID (redirect to S3 URL)."""
+    """
+    Serve an image by ID (redirect to S3 URL).
+    
+    Deprecated: /property already returns presigned image URLs, use those directly.
+    """
     try:
         from fastapi.responses import RedirectResponse
         
         logger.debug(f"Serving image request: {image_id}")
         
-        property_col = await mongo.get_property_data_collection()    
+        property_col = mongo.property_data
         property_doc = await property_col.find_one({
             "$or": [
                 {"files.id": image_id},
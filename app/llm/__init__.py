@@ -2,5 +2,5 @@
 
 # Do not import here to avoid circular imports
 # Import directly from submodules when needed:
-# from app.llm.gemini_client import get_gemini_client
+# from app.llm.openai_client import get_openai_client
 # from app.llm.prompts import IMAGE_REGENERATION_PROMPT
@@ -3,14 +3,43 @@ OpenAI API Client for Image Regeneration.
 Uses the 'gpt-image-1.5' model as requested.
 """
 
-from openai import OpenAI
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 from typing import Optional, Dict, Any, List
-import base64
+import asyncio
+try:
+    import pybase64 as b64  # SIMD-accelerated, drop-in for the stdlib API
+except ImportError:
+    import base64 as b64
 import io
+from PIL import Image
 from loguru import logger
 from app.config import settings
-from app.llm.prompts import image_regeneration_prompt
+from app.llm.prompts import format_regeneration_prompt
 from app.services.s3_service import get_s3_service
+from app.utils.s3_url import s3_key_from_url
+
+# Max concurrent S3 fetches per regeneration request
+IMAGE_FETCH_CONCURRENCY = 16
+
+# Magic-byte prefixes -> (mime type, file extension)
+_IMAGE_SIGNATURES = (
+    (b"\x89PNG", ("image/png", "png")),
+    (b"\xff\xd8", ("image/jpeg", "jpg")),
+    (b"GIF8", ("image/gif", "gif")),
+)
+
+# Formats the image edit endpoint accepts as-is
+EDIT_INPUT_MIME_TYPES = {"image/png", "image/jpeg", "image/webp"}
+
+def sniff_image_type(data: bytes) -> tuple:
+    """Detect (mime_type, extension) from the leading bytes, (None, None) if unknown."""
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp", "webp"
+    for signature, image_type in _IMAGE_SIGNATURES:
+        if data.startswith(signature):
+            return image_type
+    return None, None
 
 class OpenAIClient:
     """Wrapper for OpenAI API with image generation/editing."""
@@ -22,28 +51,22 @@ class OpenAIClient:
         if not settings.OPENAI_API_KEY:
             raise ValueError("OPENAI_API_KEY not configured in settings")
         
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        # One keep-alive pool for the process, sized for concurrent image requests
+        http_client = DefaultAsyncHttpxClient(
+            limits=httpx.Limits(max_keepalive_connections=100, max_connections=200),
+            http2=True
+        )
+        # Async client so the (multi-second) edit call never blocks the event loop
+        self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY, http_client=http_client)
         self.model = settings.OPENAI_MODEL
         self.s3_service = get_s3_service()
         logger.info(f"OpenAI client initialized with model: {self.model}")
     
-    def _extract_s3_key_from_url(self, url: str) -> Optional[str]:
-        """Extract S3 key from Object URL."""
-        try:
-            if ".amazonaws.com/" in url:
-                key = url.split(".amazonaws.com/")[1]
-                if "?" in key:
-                    key = key.split("?")[0]
-                return key
-        except Exception as e:
-            logger.warning(f"Could not extract S3 key from URL: {e}")
-        return None
-    
     def _get_image_bytes(self, img_info: Dict[str, str]) -> Optional[bytes]:
         """Resolve image bytes from URL, s3_key, or base64 data."""
         # Priority: URL -> s3_key -> data
         if "url" in img_info and img_info["url"]:
-            s3_key = self._extract_s3_key_from_url(img_info["url"])
+            s3_key = s3_key_from_url(img_info["url"])
             if s3_key:
                 return self.s3_service.get_s3_file_buffer(s3_key)
                 
@@ -53,14 +76,49 @@ class OpenAIClient:
         if "data" in img_info and img_info["data"]:
             try:
                 data = img_info["data"]
-                if "," in data:
-                    data = data.split(",")[1]
-                return base64.standard_b64decode(data)
+                # Strip a data URL prefix in a single pass (stops at the first comma)
+                prefix, sep, payload = data.partition(",")
+                if sep and prefix.startswith("data:"):
+                    data = payload
+                return b64.b64decode(data, validate=False)
             except Exception as e:
                 logger.warning(f"Failed to decode base64: {e}")
                 
         return None
 
+    def _get_input_image(self, img_info: Dict[str, str]) -> Optional[tuple]:
+        """
+        Resolve an input image as (bytes, extension).
+        
+        Accepted formats are forwarded untouched (no decode/re-encode); anything else
+        is converted to PNG with PIL as a fallback.
+        """
+        img_bytes = self._get_image_bytes(img_info)
+        if not img_bytes:
+            return None
+        
+        mime_type, extension = sniff_image_type(img_bytes)
+        if mime_type in EDIT_INPUT_MIME_TYPES:
+            return img_bytes, extension
+        
+        try:
+            with Image.open(io.BytesIO(img_bytes)) as image, io.BytesIO() as buffer:
+                image.save(buffer, format="PNG")
+                return buffer.getvalue(), "png"
+        except Exception as e:
+            logger.warning(f"Could not convert image ({mime_type or 'unknown format'}) to PNG: {e}")
+            return None
+
+    async def _fetch_image_bytes(self, images: List[Dict[str, str]]) -> List[Any]:
+        """Resolve (bytes, extension) for all images in parallel (bounded), preserving input order."""
+        semaphore = asyncio.Semaphore(IMAGE_FETCH_CONCURRENCY)
+        
+        async def fetch(img: Dict[str, str]) -> Optional[tuple]:
+            async with semaphore:
+                return await asyncio.to_thread(self._get_input_image, img)
+        
+        return await asyncio.gather(*(fetch(img) for img in images), return_exceptions=True)
+
     async def regenerate_images(
         self,
         images: List[Dict[str, str]],
@@ -70,17 +128,21 @@ class OpenAIClient:
         """
         Regenerate images based on user feedback using OpenAI.
         """
+        image_files = []
         try:
-            prompt = image_regeneration_prompt.format(user_feedback=user_feedback)
+            prompt = format_regeneration_prompt(user_feedback)
             
-            # Prepare images as file-like objects (BytesIO)
-            image_files = []
-            for img in images:
-                img_bytes = self._get_image_bytes(img)
-                if img_bytes:
-                    # Provide a name attribute as some libs expect it
+            # Fetch all source images concurrently, then wrap as file-like objects (BytesIO)
+            fetched = await self._fetch_image_bytes(images)
+            for img, input_image in zip(images, fetched):
+                if isinstance(input_image, Exception):
+                    logger.warning(f"Failed to fetch image {img}: {input_image}")
+                elif input_image:
+                    # The SDK derives the content type from the name, so match the
+                    # extension to the actual format
+                    img_bytes, extension = input_image
                     buf = io.BytesIO(img_bytes)
-                    buf.name = "input_image.png" 
+                    buf.name = f"input_image.{extension}"
                     image_files.append(buf)
                 else:
                     logger.warning(f"Could not load image: {img}")
@@ -97,7 +159,7 @@ class OpenAIClient:
             # Call OpenAI API
             # NOTE: This usage matches the user's specific request for gpt-image-1.5 
             # accepting a list of images.
-            response = self.client.images.edit(
+            response = await self.client.images.edit(
                 model=self.model,
                 image=image_files, # List of file-like objects
                 prompt=prompt
@@ -109,30 +171,16 @@ class OpenAIClient:
             # Process response
             # Assuming response structure based on standard OpenAI Image objects
             # response.data is a list of Image objects
+            mime_type = "image/png"
+            pending_uploads = []  # (position in generated_images, b64_json)
             if hasattr(response, 'data'):
                 for item in response.data:
                     # Item has b64_json or url
                     if hasattr(item, 'b64_json') and item.b64_json:
-                        image_bytes = base64.b64decode(item.b64_json)
-                        mime_type = "image/png"
-                        
                         if upload_to_s3:
-                            s3_result = self.s3_service.upload_image(
-                                image_bytes=image_bytes,
-                                folder="regenerated",
-                                filename="openai_regen",
-                                mime_type=mime_type
-                            )
-                            if s3_result:
-                                generated_images.append({
-                                    "url": s3_result["url"],
-                                    "mime_type": mime_type
-                                })
-                            else:
-                                 generated_images.append({
-                                    "data": item.b64_json,
-                                    "mime_type": mime_type
-                                })
+                            # Placeholder, filled in once the parallel uploads finish
+                            pending_uploads.append((len(generated_images), item.b64_json))
+                            generated_images.append(None)
                         else:
                             generated_images.append({
                                 "data": item.b64_json,
@@ -143,6 +191,32 @@ class OpenAIClient:
                             "url": item.url,
                             "mime_type": "image/png"
                         })
+            
+            # Upload all generated images to S3 concurrently
+            if pending_uploads:
+                s3_results = await asyncio.gather(*(
+                    asyncio.to_thread(
+                        self.s3_service.upload_image,
+                        image_bytes=b64.b64decode(b64_json),
+                        folder="regenerated",
+                        filename="openai_regen",
+                        mime_type=mime_type
+                    )
+                    for _, b64_json in pending_uploads
+                ), return_exceptions=True)
+                
+                for (position, b64_json), s3_result in zip(pending_uploads, s3_results):
+                    if isinstance(s3_result, dict):
+                        generated_images[position] = {
+                            "url": s3_result["url"],
+                            "mime_type": mime_type
+                        }
+                    else:
+                        # Fall back to returning the image inline
+                        generated_images[position] = {
+                            "data": b64_json,
+                            "mime_type": mime_type
+                        }
                         
             logger.info(f"OpenAI generated {len(generated_images)} images")
             
@@ -3,7 +3,9 @@ LLM Prompts for Property Analysis.
 Contains only the image regeneration prompt.
 """
 
-image_regeneration_prompt = """You are an expert interior designer and renovation consultant.
+from functools import lru_cache
+
+IMAGE_REGENERATION_PROMPT = """You are an expert interior designer and renovation consultant.
 Analyze these property images and regenerate them based on the user's feedback.
 
 User Feedback: {user_feedback}
@@ -22,3 +24,12 @@ Focus on:
 
 Generate the renovated version of each image based on these strict requirements.
 """
+
+# Backwards-compatible alias for the previous lowercase name
+image_regeneration_prompt = IMAGE_REGENERATION_PROMPT
+
+
+@lru_cache(maxsize=128)
+def format_regeneration_prompt(user_feedback: str) -> str:
+    """Format the regeneration prompt, cached for repeated feedback (multi-turn edits)."""
+    return IMAGE_REGENERATION_PROMPT.format(user_feedback=user_feedback)
@@ -1,9 +1,13 @@
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from app.route import setup_routes
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
 from app.middleware import setup_middlewares
 from app.config import settings
 from app.logger import setup_logger
+from app.utils.response import APIJSONResponse
 from app.services.mongo_service import get_mongo_service
 from loguru import logger
 
@@ -13,14 +17,32 @@ async def lifespan(app: FastAPI):
     logger.info("Starting up...")
     mongo = await get_mongo_service()
     
+    # Process pool for CPU-bound PDF extraction (bypasses the GIL); every uvicorn
+    # worker gets its own pool, so the default splits the cores between them
+    pdf_workers = settings.PDF_EXTRACT_WORKERS or max(1, (os.cpu_count() or 1) // max(1, settings.WEB_CONCURRENCY))
+    # forkserver: workers start from a clean server process, not forked mid-request from
+    # this one (which runs Motor monitor, threadpool and upload threads holding locks)
+    app.state.pdf_pool = ProcessPoolExecutor(
+        max_workers=pdf_workers,
+        mp_context=multiprocessing.get_context("forkserver")
+    )
+    logger.info(f"PDF extraction pool started with {pdf_workers} workers")
+    
     yield
     
     # Shutdown
     logger.info("Shutting down...")
+    app.state.pdf_pool.shutdown(wait=False, cancel_futures=True)
     if mongo:
         mongo.close()
 
-app = FastAPI(title=settings.APP_NAME, debug=settings.DEBUG, lifespan=lifespan)
+# orjson-backed responses serialize large payloads (e.g. inline base64 images) much faster
+app = FastAPI(
+    title=settings.APP_NAME,
+    debug=settings.DEBUG,
+    lifespan=lifespan,
+    default_response_class=APIJSONResponse
+)
 
 # Setup logger
 setup_logger(settings)
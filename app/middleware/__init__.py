@@ -1,8 +1,9 @@
 from app.config import settings
 from fastapi import FastAPI
-from .logging import log_requests_middleware
+from .logging import RequestLoggingMiddleware
 from fastapi.middleware.cors import CORSMiddleware
 from .jwt_auth import JWTAuthMiddleware
+from .body_limit import BodySizeLimitMiddleware
 
 def setup_middlewares(app: FastAPI):
     """Apply all middlewares to the FastAPI app"""
@@ -10,6 +11,9 @@ def setup_middlewares(app: FastAPI):
     # Add JWT authentication middleware first
     app.add_middleware(JWTAuthMiddleware)
     
+    # Cap request bodies before FastAPI parses (and spools) multipart/JSON payloads
+    app.add_middleware(BodySizeLimitMiddleware, max_body_size=settings.MAX_UPLOAD_SIZE_BYTES)
+    
     # Add CORS middleware
     app.add_middleware(
         CORSMiddleware,
@@ -20,4 +24,4 @@ def setup_middlewares(app: FastAPI):
     )
     
     # Add logging middleware last
-    app.middleware("http")(log_requests_middleware)
\ No newline at end of file
+    app.add_middleware(RequestLoggingMiddleware)
\ No newline at end of file
@@ -0,0 +1,69 @@
+from loguru import logger
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.utils.response import error_response
+
+
+class _BodyTooLarge(Exception):
+    """Raised from receive() once the streamed body passes the limit."""
+
+
+class BodySizeLimitMiddleware:
+    """
+    Pure ASGI middleware that caps request body size before any form/JSON parsing.
+
+    Requests declaring a larger Content-Length are rejected up front; otherwise the
+    streamed bytes are counted and the request is cut off with 413 as soon as the
+    limit is crossed (covers chunked uploads and lying Content-Length headers).
+    """
+
+    def __init__(self, app: ASGIApp, max_body_size: int):
+        self.app = app
+        self.max_body_size = max_body_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                if value.isdigit() and int(value) > self.max_body_size:
+                    logger.warning(f"Request rejected: body too large ({value.decode()} bytes) for {scope['path']}")
+                    await self._reject(scope, receive, send)
+                    return
+                break
+
+        received = 0
+        too_large = False
+        response_started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received, too_large
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    too_large = True
+                    raise _BodyTooLarge()
+            return message
+
+        async def guarded_send(message: Message):
+            nonlocal response_started
+            # Parsers may turn the receive() error into their own 400; replace it with the 413 below
+            if too_large and not response_started:
+                return
+            response_started = response_started or message["type"] == "http.response.start"
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except _BodyTooLarge:
+            if response_started:
+                raise
+
+        if too_large and not response_started:
+            logger.warning(f"Request rejected: body exceeded {self.max_body_size} bytes for {scope['path']}")
+            await self._reject(scope, receive, send)
+
+    async def _reject(self, scope: Scope, receive: Receive, send: Send):
+        await error_response(f"Upload exceeds maximum size of {self.max_body_size} bytes", 413)(scope, receive, send)
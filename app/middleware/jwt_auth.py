@@ -1,5 +1,5 @@
-from fastapi import HTTPException, Request, FastAPI
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from fastapi import HTTPException
+from starlette.types import ASGIApp, Receive, Scope, Send
 from loguru import logger
 from app.services.token import JWTAuth
 from app.utils.response import error_response
@@ -17,41 +17,73 @@ PUBLIC_PATHS = [
     "/auth/logout", # User logout endpoint
 ]
 
-class JWTAuthMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app: FastAPI, exclude_paths=None):
-        super().__init__(app)
+# Upper bound for the Authorization header; real access tokens are far smaller
+MAX_AUTH_HEADER_LENGTH = 4096
+
+class JWTAuthMiddleware:
+    """
+    Pure ASGI middleware (no BaseHTTPMiddleware task/buffering overhead) that
+    verifies the Bearer token and stores its payload in request.state.jwt_payload.
+    """
+
+    def __init__(self, app: ASGIApp, exclude_paths=None):
+        self.app = app
         self.exclude_paths = exclude_paths or PUBLIC_PATHS
+        # Prefix tuple for a single C-level str.startswith check ("/" is matched exactly)
+        self._public_prefixes = tuple(path for path in self.exclude_paths if path != "/")
 
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint):
-        request_path = request.url.path
-        request_method = request.method
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        logger.debug(f"JWT Middleware: {request_method} {request_path}")
+        request_path = scope["path"]
+        request_method = scope["method"]
+
+        logger.debug("JWT Middleware: {} {}", request_method, request_path)
 
         # Allow public paths without authentication
         # Special handling for root path to avoid matching all paths
-        if request_path == "/" or any(request_path.startswith(path) for path in self.exclude_paths if path != "/"):
-            logger.debug(f"Public path, skipping auth: {request_path}")
-            return await call_next(request)
+        if request_path == "/" or request_path.startswith(self._public_prefixes):
+            logger.debug("Public path, skipping auth: {}", request_path)
+            await self.app(scope, receive, send)
+            return
+
+        logger.debug("Protected path, checking auth: {}", request_path)
 
-        logger.debug(f"Protected path, checking auth: {request_path}")
+        # Get Authorization header straight from the raw (lowercased) header list
+        auth_header = None
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                auth_header = value.decode("latin-1")
+                break
 
-        # Get Authorization header
-        auth_header = request.headers.get("Authorization")
         if not auth_header:
             logger.error(f"No Authorization header for {request_method} {request_path}")
-            return error_response("Authentication required", 401)
+            await error_response("Authentication required", 401)(scope, receive, send)
+            return
+        
+        # Cheap shape checks before any base64/signature work on untrusted input
+        if len(auth_header) > MAX_AUTH_HEADER_LENGTH or auth_header[:7].lower() != "bearer ":
+            logger.error(f"Invalid Authorization header for {request_method} {request_path}")
+            await error_response("Invalid authorization header format", 401)(scope, receive, send)
+            return
+        
+        token = auth_header[7:].strip()
         
-        # Validate Bearer token format
         try:
-            jwt_payload = JWTAuth.verify_token(auth_header)
-            # Store the jwt_payload in the request state
-            request.state.jwt_payload = jwt_payload
-            logger.info(f"JWT payload set in request.state for user: {jwt_payload.get('user_id')}")
-            return await call_next(request)  # Continue processing
+            # Verified payloads are cached in JWTAuth until the token expires
+            jwt_payload = JWTAuth.verify_bearer_token(token)
         except HTTPException as e:
             logger.error(f"JWT validation error: {str(e)}")
-            return error_response(str(e.detail), e.status_code)
+            await error_response(str(e.detail), e.status_code)(scope, receive, send)
+            return
         except Exception as e:
             logger.error(f"Unexpected error in JWT middleware: {str(e)}")
-            return error_response("Internal server error", 500)
\ No newline at end of file
+            await error_response("Internal server error", 500)(scope, receive, send)
+            return
+
+        # Store the jwt_payload in the request state (request.state reads scope["state"])
+        scope.setdefault("state", {})["jwt_payload"] = jwt_payload
+        logger.info(f"JWT payload set in request.state for user: {jwt_payload.get('user_id')}")
+        await self.app(scope, receive, send)  # Continue processing
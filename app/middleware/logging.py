@@ -1,20 +1,30 @@
 import time
 from loguru import logger
-from fastapi import Request
-from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-async def log_requests_middleware(request: Request, call_next):
-    """Middleware to log API requests with execution time"""
+class RequestLoggingMiddleware:
+    """Pure ASGI middleware to log API requests with execution time (no body buffering)"""
 
-    start_time = time.time()  # Start the timer
-    
-    request_body = None
-    if request.method in ("POST", "PUT", "PATCH"):  # For methods with body
-        request_body = await request.body()
-    
-    response = await call_next(request)  # Process the request
-    
-    duration = (time.time() - start_time) * 1000  # Convert to milliseconds
-    logger.info(f"API: {request.method} {request.url.path} | Status: {response.status_code} | Time: {duration:.2f}ms")
-    
-    return response
\ No newline at end of file
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter_ns()  # Start the timer
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            # Capture the status code as the response starts
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)  # Process the request
+        finally:
+            duration = (time.perf_counter_ns() - start_time) / 1_000_000  # Convert to milliseconds
+            logger.info(f"API: {scope['method']} {scope['path']} | Status: {status_code} | Time: {duration:.2f}ms")
@@ -5,6 +5,7 @@ Pydantic models for Authentication operations.
 from pydantic import BaseModel, EmailStr, Field, field_validator
 from typing import Optional, List
 from datetime import datetime
+from app.utils.clock import now_utc
 
 class UserLogin(BaseModel):
     """Login request model."""
@@ -41,7 +42,7 @@ class UserInDB(BaseModel):
     email: str
     hashed_password: str
     full_name: Optional[str] = None
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=now_utc)
     is_active: bool = True
     refresh_tokens: List["RefreshToken"] = []
 
@@ -61,9 +62,9 @@ class TokenResponse(BaseModel):
 class RefreshToken(BaseModel):
     """Refresh token model for DB storage."""
     user_id: str
-    token_hash: str
+    token_hash: bytes  # Raw SHA-256 digest (see security.get_token_hash)
     expires_at: datetime
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=now_utc)
     revoked: bool = False
 
 class RefreshTokenRequest(BaseModel):
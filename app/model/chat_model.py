@@ -2,13 +2,16 @@
 Pydantic models for Chat/Image Regeneration operations.
 """
 
-from pydantic import BaseModel, Field
+import msgspec
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional
 from datetime import datetime
+from app.utils.clock import now_utc
 
 
 class ImageInput(BaseModel):
     """Single image input for chat."""
+    model_config = ConfigDict(defer_build=True)
     url: Optional[str] = None  # S3 Object URL (preferred from frontend)
     s3_key: Optional[str] = None  # Direct S3 key (alternative)
     data: Optional[str] = None  # Base64 encoded image data (fallback)
@@ -17,19 +20,30 @@ class ImageInput(BaseModel):
 
 class ChatRequest(BaseModel):
     """Request model for image regeneration chat."""
+    model_config = ConfigDict(defer_build=True)
     property_id: str = Field(..., description="ID of the property being edited")
     image_ids: List[str] = Field(..., description="List of image IDs to regenerate")
     user_feedback: str = Field(..., description="User's regeneration preferences and feedback")
 
 
+class ChatRequestStruct(msgspec.Struct):
+    """msgspec mirror of ChatRequest used to decode and validate the raw body."""
+    property_id: str
+    image_ids: List[str]
+    user_feedback: str
+
+
 class RegeneratedImage(BaseModel):
     """A regenerated image from the LLM."""
+    model_config = ConfigDict(defer_build=True)
     url: str  # S3 Object URL
     mime_type: str = "image/png"
 
 
 class ChatResponse(BaseModel):
     """Response model for image regeneration."""
+    # Immutable once built; unknown keys (e.g. Mongo _id) are ignored
+    model_config = ConfigDict(defer_build=True, frozen=True, extra="ignore")
     regenerated_images: List[RegeneratedImage] = Field(default_factory=list)
     description: str = ""
     input_count: int = 0
@@ -38,7 +52,8 @@ class ChatResponse(BaseModel):
 
 class ChatMessage(BaseModel):
     """Single chat message structure."""
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    model_config = ConfigDict(defer_build=True)
+    timestamp: datetime = Field(default_factory=now_utc)
     role: str
     content: Optional[str] = None
     image_ids: Optional[List[str]] = None
@@ -48,5 +63,6 @@ class ChatMessage(BaseModel):
 
 class ChatHistory(BaseModel):
     """Chat history for a property."""
+    model_config = ConfigDict(defer_build=True)
     property_id: str
     messages: List[ChatMessage] = []
@@ -2,13 +2,15 @@
 Pydantic models for Document operations.
 """
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional, Dict, Any
 from datetime import datetime
-from enum import Enum
+from app.utils.clock import now_utc
+from typing_extensions import TypedDict
 
 class ExtractedImage(BaseModel):
     """Model for an extracted image from PDF."""
+    model_config = ConfigDict(defer_build=True)
     id: str = ""  
     filename: str
     page: int
@@ -16,55 +18,69 @@ class ExtractedImage(BaseModel):
     mime_type: str = "image/png"
     category: str = "uncategorized"
 
-class FileGroup(BaseModel):
-    url: List[str] 
+# Nested file structures are only hydrated from Mongo (trusted) and sent out as JSON,
+# so they are plain TypedDicts rather than nested BaseModels
+
+class FileGroup(TypedDict):
+    """Files of one category (MLS or Comps)."""
+    url: List[str]
     images: List[ExtractedImage]
     total_images: int
     total_pages: int
 
-class FilesStructure(BaseModel):
-    mls: FileGroup = Field(default_factory=lambda: FileGroup(url=[], images=[], total_images=0, total_pages=0))
-    comps: FileGroup = Field(default_factory=lambda: FileGroup(url=[], images=[], total_images=0, total_pages=0))
+def _empty_file_group() -> FileGroup:
+    return {"url": [], "images": [], "total_images": 0, "total_pages": 0}
+
+class FilesStructure(TypedDict):
+    """Categorized property files."""
+    mls: FileGroup
+    comps: FileGroup
+
+def _empty_files() -> FilesStructure:
+    return {"mls": _empty_file_group(), "comps": _empty_file_group()}
 
 class PDFUploadResponse(BaseModel):
     """Response model for PDF upload."""
+    # Immutable once built; unknown keys (e.g. Mongo _id) are ignored
+    model_config = ConfigDict(defer_build=True, frozen=True, extra="ignore")
     property_id: str
     user_id: str
     total_files: int
     files: FilesStructure
     message: str = "PDFs processed successfully"
 
-class PropertyFiles(BaseModel):
-    """Categorized property files."""
-    mls: FileGroup = Field(default_factory=lambda: FileGroup(url=[], images=[], total_images=0, total_pages=0))
-    comps: FileGroup = Field(default_factory=lambda: FileGroup(url=[], images=[], total_images=0, total_pages=0))
+# Categorized property files share the upload response structure
+PropertyFiles = FilesStructure
 
 class PropertyData(BaseModel):
     """Model for storing property/session data in MongoDB."""
+    model_config = ConfigDict(defer_build=True)
     property_id: str
     user_id: str
-    files: PropertyFiles = PropertyFiles()
+    files: PropertyFiles = Field(default_factory=_empty_files)
     pdf_urls: List[str] = []
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=now_utc)
 
-class ProjectSummary(BaseModel):
+# Serialization-only response shapes: plain TypedDicts (no validation or schema build)
+
+class ProjectSummary(TypedDict):
     """Summary of a property project for the portfolio list."""
     property_id: str
-    created_at: datetime
+    created_at: Optional[datetime]  # Serialized as ISO 8601 (UTC)
     total_images: int
-    thumbnail_url: Optional[str] = None
+    thumbnail_url: Optional[str]
 
-class ExtractedImageResponse(BaseModel):
-    """Response model for extracted image (excludes S3 URL)."""
+class ExtractedImageResponse(TypedDict):
+    """Response shape for extracted image (excludes S3 URL)."""
     id: str
     filename: str
     page: int
-    mime_type: str = "image/png"
+    mime_type: str
 
-class PropertyDataResponse(BaseModel):
-    """Response model for property data (excludes S3 URLs from images)."""
+class PropertyDataResponse(TypedDict):
+    """Response shape for property data (excludes S3 URLs from images)."""
     property_id: str
     user_id: str
     files: List[ExtractedImageResponse]
-    pdf_urls: List[str] = []
+    pdf_urls: List[str]
     created_at: datetime
@@ -1,11 +1,16 @@
 from fastapi import FastAPI, Request
 from starlette.exceptions import HTTPException
 from fastapi.exceptions import RequestValidationError
-from app.controller.auth_controller import router as auth_router
-from app.controller.doc_controller import router as doc_router
-from app.controller.chat_controller import router as chat_router
 from app.utils.response import error_response
 
+# Pre-lowercased messages for the most common pydantic error types
+_VALIDATION_MESSAGES = {
+    "missing": "field required",
+    "string_type": "input should be a valid string",
+    "list_type": "input should be a valid list",
+    "json_invalid": "json decode error",
+}
+
 def setup_routes(app: FastAPI):
     """Setup all routes for the application"""
 
@@ -21,16 +26,24 @@ def setup_routes(app: FastAPI):
     @app.exception_handler(RequestValidationError)
     async def validation_exception_handler(request: Request, exc: RequestValidationError):
         # Get only the first error
-        if exc.errors():
-            error = exc.errors()[0]
+        errors = exc.errors()
+        if errors:
+            error = errors[0]
             field = error["loc"][-1] if error["loc"] else "unknown field"
-            error_message = f"{field} {error['msg']}".lower()
+            msg = _VALIDATION_MESSAGES.get(error.get("type"), error["msg"])
+            error_message = f"{field} {msg}"
+            if not error_message.islower():
+                error_message = error_message.lower()
         else:
             error_message = "Validation error"
         
         return error_response(error_message, 422)
 
-    # Include all routes
+    # Include all routes (controllers imported here to keep package import light)
+    from app.controller.auth_controller import router as auth_router
+    from app.controller.doc_controller import router as doc_router
+    from app.controller.chat_controller import router as chat_router
+
     app.include_router(auth_router, prefix="/auth", tags=["Auth"])
     app.include_router(doc_router, prefix="/doc", tags=["Document"])
     app.include_router(chat_router, prefix="/chat", tags=["Chat"])
\ No newline at end of file
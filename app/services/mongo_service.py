@@ -2,12 +2,12 @@
 MongoDB Service for database operations (Async).
 """
 
-from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+import asyncio
+from pymongo import IndexModel
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase, AsyncIOMotorCollection
 from typing import Optional
 from loguru import logger
 from app.config import settings
-from datetime import datetime
-from passlib.context import CryptContext
 
 class MongoService:
     """Async MongoDB connection and database operations."""
@@ -19,6 +19,11 @@ class MongoService:
         self.client: Optional[AsyncIOMotorClient] = None
         self.db: Optional[AsyncIOMotorDatabase] = None
         
+        # Collection handles, cached once after connect
+        self.users: Optional[AsyncIOMotorCollection] = None
+        self.property_data: Optional[AsyncIOMotorCollection] = None
+        self.chat: Optional[AsyncIOMotorCollection] = None
+        
     async def connect(self):
         """Establish connection to MongoDB."""
         if self.client:
@@ -30,12 +35,28 @@ class MongoService:
                 return
             
             # Connect to MongoDB
-            self.client = AsyncIOMotorClient(settings.MONGODB_URI)
+            self.client = AsyncIOMotorClient(
+                settings.MONGODB_URI,
+                maxPoolSize=settings.MONGODB_MAX_POOL_SIZE,
+                minPoolSize=settings.MONGODB_MIN_POOL_SIZE,
+                serverSelectionTimeoutMS=settings.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+                connectTimeoutMS=settings.MONGODB_CONNECT_TIMEOUT_MS,
+                socketTimeoutMS=settings.MONGODB_SOCKET_TIMEOUT_MS,
+                maxIdleTimeMS=settings.MONGODB_MAX_IDLE_TIME_MS,
+                waitQueueTimeoutMS=settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS,
+                appname=settings.APP_NAME,
+                retryWrites=True,
+                compressors=settings.MONGODB_COMPRESSORS
+            )
             self.db = self.client[settings.MONGODB_DB_NAME]
+            self.users = self.db[settings.MONGODB_USER_COLLECTION]
+            self.property_data = self.db[settings.MONGODB_PROPERTY_COLLECTION]
+            self.chat = self.db[settings.MONGODB_CHAT_COLLECTION]
             
-            # Test connection
-            await self.client.admin.command('ping')
-            logger.info("MongoDB connection successful")
+            # Test connection (optional; the driver connects lazily on first operation)
+            if settings.MONGODB_STARTUP_PING:
+                await self.ping()
+                logger.info("MongoDB connection successful")
             
             # Ensure indexes
             await self._ensure_indexes()
@@ -46,98 +67,71 @@ class MongoService:
             logger.error(f"Failed to connect to MongoDB: {e}")
             self.client = None
             self.db = None
+            self.users = None
+            self.property_data = None
+            self.chat = None
     
-    async def _ensure_collection_exists(self, collection_name: str):
-        """Ensure a collection exists, create if it doesn't."""
-        if self.db is None:
-            logger.error("Database not initialized")
-            return False
-            
-        try:
-            # List existing collections
-            existing_collections = await self.db.list_collection_names()
-            
-            if collection_name not in existing_collections:
-                # Create the collection
-                await self.db.create_collection(collection_name)
-                logger.info(f"Created collection: {collection_name}")
-            else:
-                pass 
-                # logger.debug(f"Collection already exists: {collection_name}")
-                
-            return True
-        except Exception as e:
-            logger.error(f"Error ensuring collection {collection_name} exists: {e}")
-            return False
-            
     async def _ensure_indexes(self):
-        """Create necessary indexes."""
+        """Create necessary indexes (create_index also creates missing collections)."""
         if self.db is None:
             return
             
         try:
-            # 1. User Collection
-            await self._ensure_collection_exists(settings.MONGODB_USER_COLLECTION)
-            user_col = self.db[settings.MONGODB_USER_COLLECTION]
-            user_indexes = await user_col.index_information()
-            
-            if "email_1" not in user_indexes:
-                await user_col.create_index("email", unique=True)
-                logger.info("Created email index on prop_user_data")
-            
-            # Index for refresh token lookup
-            if "refresh_tokens.token_hash_1" not in user_indexes:
-                await user_col.create_index("refresh_tokens.token_hash")
-                logger.info("Created refresh_tokens.token_hash index on prop_user_data")
-
-            # 2. Property Collection
-            await self._ensure_collection_exists(settings.MONGODB_PROPERTY_COLLECTION)
-            prop_col = self.db[settings.MONGODB_PROPERTY_COLLECTION]
-            prop_indexes = await prop_col.index_information()
-            
-            if "property_id_1" not in prop_indexes:
-                await prop_col.create_index("property_id", unique=True)
-                logger.info("Created property_id index on prop_property_data")
-                
-            if "user_id_1" not in prop_indexes:
-                await prop_col.create_index("user_id")
-                logger.info("Created user_id index on prop_property_data")
-
-            # 3. Chat History Collection
-            await self._ensure_collection_exists(settings.MONGODB_CHAT_COLLECTION)
-            chat_col = self.db[settings.MONGODB_CHAT_COLLECTION]
-            chat_indexes = await chat_col.index_information()
-            
-            if "property_id_1" not in chat_indexes:
-                await chat_col.create_index("property_id", unique=True)
-                logger.info("Created property_id index on prop_chat_history")
+            # create_indexes is idempotent (existing matching indexes are no-ops), so
+            # skip the index_information() probes and build all collections concurrently
+            await asyncio.gather(
+                # 1. User Collection (email + refresh token lookup)
+                self.db[settings.MONGODB_USER_COLLECTION].create_indexes([
+                    IndexModel("email", unique=True),
+                    IndexModel("refresh_tokens.token_hash")
+                ]),
+                # 2. Property Collection
+                self.db[settings.MONGODB_PROPERTY_COLLECTION].create_indexes([
+                    IndexModel("property_id", unique=True),
+                    IndexModel("user_id")
+                ]),
+                # 3. Chat History Collection
+                self.db[settings.MONGODB_CHAT_COLLECTION].create_indexes([
+                    IndexModel("property_id", unique=True)
+                ])
+            )
             
             logger.info("MongoDB indexes verified for all collections")
         except Exception as e:
             logger.error(f"Error creating indexes: {e}")
 
     
+    async def ping(self) -> bool:
+        """
+        Check the server is reachable.
+        Raises on failure so callers can surface the driver error.
+        """
+        if self.client is None:
+            return False
+        
+        await self.client.admin.command('ping')
+        return True
+    
     async def get_collection(self, collection_name: str):
-        """Get a MongoDB collection, ensuring it exists first."""
+        """Get a MongoDB collection."""
         if self.db is None:
             logger.error("MongoDB database not initialized")
             return None
             
-        # Ensure collection exists
-        # await self._ensure_collection_exists(collection_name) # Too noisy to log every check
+        # Collections are created implicitly by MongoDB on first write / index build
         return self.db[collection_name]
     
     async def get_users_collection(self):
-        """Get the users collection."""
-        return await self.get_collection(settings.MONGODB_USER_COLLECTION)
+        """Get the users collection (prefer the cached `users` attribute)."""
+        return self.users
     
     async def get_property_data_collection(self):
-        """Get the properties collection."""
-        return await self.get_collection(settings.MONGODB_PROPERTY_COLLECTION)
+        """Get the properties collection (prefer the cached `property_data` attribute)."""
+        return self.property_data
 
     async def get_chat_collection(self):
-        """Get the chat history collection."""
-        return await self.get_collection(settings.MONGODB_CHAT_COLLECTION)
+        """Get the chat history collection (prefer the cached `chat` attribute)."""
+        return self.chat
 
     def close(self):
         """Close MongoDB connection."""
@@ -145,10 +139,17 @@ class MongoService:
             self.client.close()
             logger.info("MongoDB connection closed")
 
+# Guards first-time initialization against concurrent callers
+_init_lock = asyncio.Lock()
+
 # Singleton accessor
 async def get_mongo_service() -> MongoService:
     """Get the MongoDB service singleton, initializing connection if needed."""
     if MongoService._instance is None:
-        MongoService._instance = MongoService()
-        await MongoService._instance.connect()
+        async with _init_lock:
+            # Re-check: another coroutine may have initialized while we waited
+            if MongoService._instance is None:
+                instance = MongoService()
+                await instance.connect()
+                MongoService._instance = instance
     return MongoService._instance
@@ -1,17 +1,116 @@
 """
 PDF Image Extraction Service.
-Extracts images and captions from PDF files using pdfplumber.
+Extracts images and captions from PDF files using pdfplumber (or PyMuPDF, if configured).
 Uploads extracted images to S3 and returns URLs.
 """
 
 import pdfplumber
 import io
+from pdfminer.pdftypes import LITERALS_DCT_DECODE, resolve1
+import operator
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, BinaryIO, List, Optional, Tuple, Union
 from loguru import logger
+from app.config import settings
 from app.services.s3_service import get_s3_service
 
 
+try:
+    import pymupdf
+except ImportError:  # Optional faster backend
+    pymupdf = None
+
+# Filter out small images (logos, icons, etc.)
+# Lowered thresholds to capture house photos while filtering tiny logos
+# Most house photos in PDFs are at least 150x100 or larger
+MIN_IMAGE_WIDTH = 150
+MIN_IMAGE_HEIGHT = 100
+MIN_IMAGE_AREA = 15000  # 150x100 = 15,000 pixels
+
+# Reading order for pdfplumber images: top-to-bottom, then left-to-right (C-level key)
+_IMG_SORT_KEY = operator.itemgetter('top', 'x0')
+
+# Pages handed to a pool worker per task; amortizes re-opening and parsing the PDF per task
+PDF_PAGES_PER_TASK = 4
+
+# Encodings that can be uploaded as-is (extension -> MIME type)
+_EXT_MIME_TYPES = {
+    "png": "image/png",
+    "jpg": "image/jpeg",
+    "jpeg": "image/jpeg",
+    "webp": "image/webp",
+    "gif": "image/gif",
+}
+
+# Shared pool for overlapping per-image S3 PUTs (I/O-bound, so threads are enough)
+_upload_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _is_web_colorspace(colorspace) -> bool:
+    """True for gray/RGB colorspaces: DeviceGray, DeviceRGB, or ICCBased with N of 1 or 3."""
+    colorspace = resolve1(colorspace)
+    if isinstance(colorspace, list) and colorspace:
+        if getattr(resolve1(colorspace[0]), "name", None) != "ICCBased" or len(colorspace) < 2:
+            return False
+        profile = resolve1(colorspace[1])
+        return getattr(profile, "get", lambda _key: None)("N") in (1, 3)
+    return getattr(colorspace, "name", None) in ("DeviceRGB", "DeviceGray")
+
+
+def _embedded_jpeg_bytes(img: Dict) -> Optional[bytes]:
+    """
+    Return the raw JPEG stream of a pdfplumber image if it can be served unchanged.
+    
+    Only plain DCTDecode streams in gray/RGB (including ICC-tagged) qualify; masked,
+    Decode-remapped, CMYK, multi-filter or non-JPEG encodings (Flate, JBIG2, CCITT, JPX)
+    return None and get rendered instead.
+    """
+    stream = img.get("stream")
+    if stream is None or img.get("imagemask"):
+        return None
+    if any(stream.get(key) is not None for key in ("SMask", "Mask", "Decode")):
+        return None
+    
+    filters = stream.get_filters()
+    if len(filters) != 1 or filters[0][0] not in LITERALS_DCT_DECODE:
+        return None
+    
+    colorspace = img.get("colorspace") or []
+    if len(colorspace) != 1 or not _is_web_colorspace(colorspace[0]):
+        return None
+    
+    return stream.get_rawdata()
+
+
+def _as_stream(pdf: Union[bytes, BinaryIO]) -> BinaryIO:
+    """Wrap raw bytes in a BytesIO; pass file objects through rewound, without copying."""
+    if isinstance(pdf, (bytes, bytearray, memoryview)):
+        return io.BytesIO(pdf)
+    pdf.seek(0)
+    return pdf
+
+
+def _open_pymupdf(pdf: Union[bytes, BinaryIO]):
+    """Open a PDF with PyMuPDF from bytes, a BytesIO, or a real file (opened by path, not read into memory)."""
+    name = getattr(pdf, "name", None)
+    if isinstance(name, str):
+        return pymupdf.open(name)
+    return pymupdf.open(stream=pdf, filetype="pdf")
+
+
+def _get_upload_executor() -> ThreadPoolExecutor:
+    """Get or create the S3 upload thread pool."""
+    global _upload_executor
+    if _upload_executor is None:
+        _upload_executor = ThreadPoolExecutor(
+            max_workers=settings.S3_UPLOAD_CONCURRENCY or 16,
+            thread_name_prefix="s3-upload"
+        )
+    return _upload_executor
+
+
+
 class PDFExtractor:
     """Service for extracting images from PDF files."""
     
@@ -46,31 +145,7 @@ class PDFExtractor:
         try:
             with pdfplumber.open(pdf_path) as pdf:
                 results["total_pages"] = len(pdf.pages)
-                
-                for page_num, page in enumerate(pdf.pages):
-                    images = page.images
-                    if not images:
-                        continue
-                    
-                    sorted_images = sorted(images, key=lambda x: (x['top'], x['x0']))
-                    
-                    for img_num, img in enumerate(sorted_images):
-                        try:
-                            image_data = self._extract_and_upload_image(
-                                page=page,
-                                img=img,
-                                page_num=page_num,
-                                img_num=img_num,
-                                folder=folder,
-                                caption_offset=caption_offset
-                            )
-                            
-                            if image_data:
-                                results["images"].append(image_data)
-                                
-                        except Exception as e:
-                            logger.warning(f"Failed to extract image {img_num} on page {page_num}: {e}")
-                            continue
+                results["images"] = self._extract_pages(pdf, folder, caption_offset, range(results["total_pages"]))
                 
         except Exception as e:
             logger.error(f"Error processing PDF {pdf_path}: {e}")
@@ -81,19 +156,22 @@ class PDFExtractor:
     
     def extract_images_from_bytes(
         self,
-        pdf_bytes: bytes,
+        pdf_bytes: Union[bytes, BinaryIO],
         pdf_filename: str,
         folder: str = "extracted",
-        caption_offset: int = 30
+        caption_offset: int = 30,
+        pages: Optional[range] = None
     ) -> Dict[str, Any]:
         """
         Extract all images from PDF bytes (e.g., downloaded from S3) and upload to S3.
         
         Args:
-            pdf_bytes: PDF file content as bytes
+            pdf_bytes: PDF file content as bytes, or a seekable binary file object
+                (e.g. from S3Service.get_s3_file_stream), which is used without copying
             pdf_filename: Original filename for metadata
             folder: S3 folder prefix for uploads
             caption_offset: Pixels below image to look for caption text
+            pages: Optional 0-based page range to process (defaults to all pages)
             
         Returns:
             Dict with total_pages and images list (each with S3 URL)
@@ -105,54 +183,97 @@ class PDFExtractor:
         }
         
         try:
-            # Open PDF from bytes using BytesIO
-            pdf_stream = io.BytesIO(pdf_bytes)
+            # File objects are read in place; raw bytes get a BytesIO view
+            pdf_stream = _as_stream(pdf_bytes)
             
             with pdfplumber.open(pdf_stream) as pdf:
                 results["total_pages"] = len(pdf.pages)
-                
-                for page_num, page in enumerate(pdf.pages):
-                    images = page.images
-                    if not images:
-                        continue
-                    
-                    sorted_images = sorted(images, key=lambda x: (x['top'], x['x0']))
-                    
-                    for img_num, img in enumerate(sorted_images):
-                        try:
-                            image_data = self._extract_and_upload_image(
-                                page=page,
-                                img=img,
-                                page_num=page_num,
-                                img_num=img_num,
-                                folder=folder,
-                                caption_offset=caption_offset
-                            )
-                            
-                            if image_data:
-                                results["images"].append(image_data)
-                                
-                        except Exception as e:
-                            logger.warning(f"Failed to extract image {img_num} on page {page_num}: {e}")
-                            continue
+                pages = pages if pages is not None else range(results["total_pages"])
+                results["images"] = self._extract_pages(pdf, folder, caption_offset, pages)
                 
         except Exception as e:
             logger.error(f"Error processing PDF {pdf_filename} from bytes: {e}")
             raise
         
-        logger.info(f"PDF Extract Summary for {pdf_filename}: {len(results['images'])} images extracted from {results['total_pages']} pages")
+        logger.info(f"PDF Extract Summary for {pdf_filename}: {len(results['images'])} images extracted from {len(pages)} of {results['total_pages']} pages")
         return results
     
-    def _extract_and_upload_image(
+    def count_pages(self, pdf_bytes: Union[bytes, BinaryIO]) -> int:
+        """Return the number of pages in a PDF."""
+        with pdfplumber.open(_as_stream(pdf_bytes)) as pdf:
+            return len(pdf.pages)
+    
+    def _extract_pages(self, pdf, folder: str, caption_offset: int, pages: range) -> List[Dict[str, Any]]:
+        """
+        Render every qualifying image on the calling thread and upload them concurrently.
+        
+        pdfplumber pages are not thread-safe, so only the S3 PUTs go to the upload pool;
+        results are collected in submission order to keep page/image ordering stable.
+        """
+        executor = _get_upload_executor()
+        pending = []
+        
+        for page_num in pages:
+            page = pdf.pages[page_num]
+            images = page.images
+            if not images:
+                continue
+            
+            sorted_images = sorted(images, key=_IMG_SORT_KEY)
+            
+            for img_num, img in enumerate(sorted_images):
+                try:
+                    rendered = self._render_image(
+                        page=page,
+                        img=img,
+                        page_num=page_num,
+                        img_num=img_num,
+                        caption_offset=caption_offset
+                    )
+                except Exception as e:
+                    logger.warning(f"Failed to extract image {img_num} on page {page_num}: {e}")
+                    continue
+                
+                if rendered:
+                    image_bytes, caption, img_filename, ext = rendered
+                    mime_type = _EXT_MIME_TYPES[ext]
+                    future = executor.submit(self._upload_only, image_bytes, img_filename, folder, mime_type)
+                    pending.append((future, page_num, caption, f"{img_filename}.{ext}", mime_type))
+        
+        return self._collect_uploads(pending)
+    
+    def _collect_uploads(self, pending: List[Tuple]) -> List[Dict[str, Any]]:
+        """Wait for submitted uploads (in submission order) and build the image result dicts."""
+        extracted = []
+        for future, page_num, caption, filename, mime_type in pending:
+            try:
+                s3_result = future.result()
+            except Exception as e:
+                logger.warning(f"Failed to upload {filename} from page {page_num + 1}: {e}")
+                continue
+            
+            if s3_result:
+                extracted.append({
+                    "filename": filename,
+                    "page": page_num + 1,
+                    "caption": caption,
+                    "url": s3_result["url"],
+                    "mime_type": mime_type
+                })
+            else:
+                logger.warning("S3 upload failed")
+        
+        return extracted
+    
+    def _render_image(
         self,
         page,
         img: Dict,
         page_num: int,
         img_num: int,
-        folder: str,
         caption_offset: int
-    ) -> Dict[str, Any]:
-        """Extract a single image from a PDF page and upload to S3."""
+    ) -> Optional[Tuple[bytes, str, str, str]]:
+        """Extract a single image (and its caption) from a PDF page; returns (image_bytes, caption, filename, ext)."""
         img_bbox = (img['x0'], img['top'], img['x1'], img['bottom'])
         
         # Calculate image dimensions
@@ -161,13 +282,7 @@ class PDFExtractor:
         img_area = img_width * img_height
         
         # Filter out small images (logos, icons, etc.)
-        # Lowered thresholds to capture house photos while filtering tiny logos
-        # Most house photos in PDFs are at least 150x100 or larger
-        MIN_WIDTH = 150
-        MIN_HEIGHT = 100
-        MIN_AREA = 15000  # 150x100 = 15,000 pixels
-        
-        if img_width < MIN_WIDTH or img_height < MIN_HEIGHT or img_area < MIN_AREA:
+        if img_width < MIN_IMAGE_WIDTH or img_height < MIN_IMAGE_HEIGHT or img_area < MIN_IMAGE_AREA:
             # logger.debug(
             #     f"Skipping small image on page {page_num + 1}: "
             #     f"{img_width:.0f}x{img_height:.0f} (area: {img_area:.0f})"
@@ -194,38 +309,156 @@ class PDFExtractor:
         except Exception:
             caption = ""
         
+        img_filename = f"page{page_num + 1}_img{img_num + 1}"
+        
+        # Embedded JPEGs are uploaded as-is, skipping the rasterize + PNG encode below
+        jpeg_bytes = _embedded_jpeg_bytes(img)
+        if jpeg_bytes:
+            return jpeg_bytes, caption, img_filename, "jpg"
+        
         # Extract image as bytes
         try:
             img_obj = page.crop(img_bbox).to_image(resolution=200)
-            buffer = io.BytesIO()
-            img_obj.save(buffer, format='PNG')
-            buffer.seek(0)
-            image_bytes = buffer.read()
+            with io.BytesIO() as buffer:
+                img_obj.save(buffer, format='PNG')
+                image_bytes = buffer.getvalue()
         except Exception as e:
             logger.warning(f"Could not extract image: {e}")
             return None
         
-        img_filename = f"page{page_num + 1}_img{img_num + 1}"
-        
-        # Upload to S3
-        s3_result = self.s3_service.upload_image(
+        return image_bytes, caption, img_filename, "png"
+    
+    def _upload_only(
+        self,
+        image_bytes: bytes,
+        img_filename: str,
+        folder: str,
+        mime_type: str = "image/png"
+    ) -> Optional[Dict[str, Any]]:
+        """Upload rendered image bytes to S3 (runs on the upload pool)."""
+        return self.s3_service.upload_image(
             image_bytes=image_bytes,
             folder=folder,
             filename=img_filename,
-            mime_type="image/png"
+            mime_type=mime_type,
+            dedupe=True
         )
+
+
+class PyMuPDFExtractor(PDFExtractor):
+    """
+    PDFExtractor backed by PyMuPDF (MuPDF) instead of pdfplumber/pdfminer.
+    
+    Embedded images are uploaded in their original encoding via extract_image(),
+    skipping the crop + 200 DPI re-rasterization + PNG encode of the pdfplumber path.
+    Images with a soft mask or an encoding browsers can't show are rendered instead.
+    """
+    
+    def __init__(self):
+        if pymupdf is None:
+            raise ImportError("PyMuPDF is not installed; install pymupdf to use this extractor")
+        super().__init__()
+    
+    def extract_images_with_urls(
+        self,
+        pdf_path: str,
+        folder: str = "extracted",
+        caption_offset: int = 30
+    ) -> Dict[str, Any]:
+        """Extract all images from a PDF file and upload to S3 (same shape as PDFExtractor)."""
+        with open(pdf_path, "rb") as f:
+            return self.extract_images_from_bytes(f.read(), Path(pdf_path).name, folder, caption_offset)
+    
+    def count_pages(self, pdf_bytes: Union[bytes, BinaryIO]) -> int:
+        """Return the number of pages in a PDF."""
+        with _open_pymupdf(pdf_bytes) as doc:
+            return doc.page_count
+    
+    def extract_images_from_bytes(
+        self,
+        pdf_bytes: Union[bytes, BinaryIO],
+        pdf_filename: str,
+        folder: str = "extracted",
+        caption_offset: int = 30,
+        pages: Optional[range] = None
+    ) -> Dict[str, Any]:
+        """Extract all images from PDF bytes or a BytesIO and upload to S3 (same shape as PDFExtractor)."""
+        results = {
+            "pdf_filename": pdf_filename,
+            "total_pages": 0,
+            "images": []
+        }
         
-        if s3_result:
-            return {
-                "filename": f"{img_filename}.png",
-                "page": page_num + 1,
-                "caption": caption,
-                "url": s3_result["url"],
-                "mime_type": "image/png"
-            }
-        else:
-            logger.warning("S3 upload failed")
+        try:
+            with _open_pymupdf(pdf_bytes) as doc:
+                results["total_pages"] = doc.page_count
+                pages = pages if pages is not None else range(results["total_pages"])
+                results["images"] = self._extract_document(doc, folder, caption_offset, pages)
+                
+        except Exception as e:
+            logger.error(f"Error processing PDF {pdf_filename} from bytes: {e}")
+            raise
+        
+        logger.info(f"PDF Extract Summary for {pdf_filename}: {len(results['images'])} images extracted from {len(pages)} of {results['total_pages']} pages")
+        return results
+    
+    def _extract_document(self, doc, folder: str, caption_offset: int, pages: range) -> List[Dict[str, Any]]:
+        """Pull qualifying images out of the given pages and upload them concurrently."""
+        executor = _get_upload_executor()
+        pending = []
+        
+        for page_num in pages:
+            page = doc[page_num]
+            # One entry per image placement, with its bbox on the page
+            infos = [info for info in page.get_image_info(xrefs=True) if info.get("xref")]
+            if not infos:
+                continue
+            
+            infos.sort(key=lambda info: (info["bbox"][1], info["bbox"][0]))
+            
+            for img_num, info in enumerate(infos):
+                try:
+                    extracted = self._extract_placement(doc, page, info, caption_offset)
+                except Exception as e:
+                    logger.warning(f"Failed to extract image {img_num} on page {page_num}: {e}")
+                    continue
+                
+                if extracted:
+                    image_bytes, caption, ext = extracted
+                    img_filename = f"page{page_num + 1}_img{img_num + 1}"
+                    mime_type = _EXT_MIME_TYPES[ext]
+                    future = executor.submit(self._upload_only, image_bytes, img_filename, folder, mime_type)
+                    pending.append((future, page_num, caption, f"{img_filename}.{ext}", mime_type))
+        
+        return self._collect_uploads(pending)
+    
+    def _extract_placement(self, doc, page, info: Dict, caption_offset: int) -> Optional[Tuple[bytes, str, str]]:
+        """Return (image_bytes, caption, ext) for one image placement, or None if it is too small."""
+        x0, top, x1, bottom = info["bbox"]
+        img_width = x1 - x0
+        img_height = bottom - top
+        
+        if img_width < MIN_IMAGE_WIDTH or img_height < MIN_IMAGE_HEIGHT or img_width * img_height < MIN_IMAGE_AREA:
             return None
+        
+        caption_rect = pymupdf.Rect(
+            max(0, x0),
+            bottom,
+            min(page.rect.width, x1),
+            min(page.rect.height, bottom + caption_offset)
+        )
+        try:
+            caption = page.get_text("text", clip=caption_rect).strip()
+        except Exception:
+            caption = ""
+        
+        raw = doc.extract_image(info["xref"])
+        if raw and not raw.get("smask") and raw.get("ext") in _EXT_MIME_TYPES:
+            return raw["image"], caption, raw["ext"]
+        
+        # Masked or exotic encodings (JBIG2, JPX, CMYK...): render the placement instead
+        pixmap = page.get_pixmap(clip=pymupdf.Rect(x0, top, x1, bottom), dpi=200)
+        return pixmap.tobytes("png"), caption, "png"
 
 
 # Singleton instance
@@ -233,8 +466,47 @@ _pdf_extractor = None
 
 
 def get_pdf_extractor() -> PDFExtractor:
-    """Get or create the PDF extractor singleton."""
+    """Get or create the PDF extractor singleton (backend chosen by PDF_EXTRACTOR_BACKEND)."""
     global _pdf_extractor
     if _pdf_extractor is None:
-        _pdf_extractor = PDFExtractor()
+        if settings.PDF_EXTRACTOR_BACKEND == "pymupdf" and pymupdf is not None:
+            _pdf_extractor = PyMuPDFExtractor()
+        else:
+            if settings.PDF_EXTRACTOR_BACKEND == "pymupdf":
+                logger.warning("PDF_EXTRACTOR_BACKEND=pymupdf but PyMuPDF is not installed; using pdfplumber")
+            _pdf_extractor = PDFExtractor()
     return _pdf_extractor
+
+
+def page_blocks(total_pages: int, block_size: int = PDF_PAGES_PER_TASK) -> List[range]:
+    """Split a page count into consecutive 0-based page ranges of at most block_size pages."""
+    return [range(start, min(start + block_size, total_pages)) for start in range(0, total_pages, block_size)]
+
+
+def count_pages_in_worker(pdf_path: str) -> int:
+    """Module-level (picklable) page count for use with a ProcessPoolExecutor."""
+    with open(pdf_path, "rb") as pdf_file:
+        return get_pdf_extractor().count_pages(pdf_file)
+
+
+def extract_images_in_worker(
+    pdf_path: str,
+    pdf_filename: str,
+    folder: str,
+    pages: Optional[range] = None
+) -> Dict[str, Any]:
+    """
+    Module-level (picklable) entry point for running extraction in a ProcessPoolExecutor.
+    Each worker process lazily builds its own extractor and S3 client.
+    
+    The PDF is read from pdf_path (a file shared by all tasks of one upload) so only
+    the path and page range cross the process boundary, not the PDF bytes.
+    Pass pages to extract only a block of pages, so one PDF can be spread across workers.
+    """
+    with open(pdf_path, "rb") as pdf_file:
+        return get_pdf_extractor().extract_images_from_bytes(
+            pdf_bytes=pdf_file,
+            pdf_filename=pdf_filename,
+            folder=folder,
+            pages=pages
+        )
@@ -5,14 +5,37 @@ Based on official AWS Boto3 documentation.
 """
 
 import boto3
+from functools import lru_cache
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import ClientError
-from typing import Optional
+from typing import List, Optional
 import uuid
 import io
+import hashlib
 from loguru import logger
 from app.config import settings
 
 
+# S3 DeleteObjects accepts at most 1000 keys per request
+DELETE_BATCH_SIZE = 1000
+
+
+@lru_cache(maxsize=None)
+def get_boto3_session() -> boto3.session.Session:
+    """
+    Shared boto3 session built from settings.
+    
+    Session creation loads botocore's service/endpoint data and resolves
+    credentials; doing it once lets every AWS client reuse that work.
+    """
+    return boto3.session.Session(
+        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+        region_name=settings.AWS_REGION
+    )
+
+
 class S3Service:
     """Service for AWS S3 operations."""
     
@@ -28,24 +51,73 @@ class S3Service:
             self.client = None
             return
         
-        # Initialize S3 client
-        self.client = boto3.client(
-            's3',
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-            region_name=settings.AWS_REGION
+        # Size the HTTP pool for parallel fetches/uploads (botocore defaults to 10)
+        client_config = Config(
+            max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+            retries={'max_attempts': 5, 'mode': 'adaptive'},
+            tcp_keepalive=True,
+            # Explicit SigV4: us-east-1 otherwise presigns with SigV2
+            signature_version='s3v4'
         )
+        
+        # Initialize S3 client from the shared session (credentials/endpoint data loaded once)
+        self.client = get_boto3_session().client('s3', config=client_config)
         self.bucket_name = settings.AWS_BUCKET_NAME
         self.region = settings.AWS_REGION
         
+        # Multipart (parallel part) transfers for large objects; small ones stay a single request
+        self._transfer_config = TransferConfig(
+            multipart_threshold=8 * 1024 * 1024,
+            multipart_chunksize=16 * 1024 * 1024,
+            max_concurrency=16,
+            use_threads=True
+        )
+        
         logger.info(f"S3 service initialized for bucket: {self.bucket_name} in {self.region}")
     
-    def _generate_key(self, folder: str, filename: str, extension: str = "png") -> str:
-        """Generate a unique S3 object key."""
-        unique_id = str(uuid.uuid4())[:8]
+    def _generate_key(
+        self,
+        folder: str,
+        filename: str,
+        extension: str = "png",
+        content: Optional[bytes] = None
+    ) -> str:
+        """
+        Generate an S3 object key.
+        
+        With content, the key is content-addressed ({folder}/{blake2b digest}.{ext}),
+        so identical bytes in the same folder always map to the same object.
+        Without it, a random prefix keeps the key unique.
+        """
         folder = folder.strip('/')
+        if content is not None:
+            digest = hashlib.blake2b(content, digest_size=16).hexdigest()
+            return f"{folder}/{digest}.{extension}"
+        unique_id = str(uuid.uuid4())[:8]
         return f"{folder}/{unique_id}_{filename}.{extension}"
     
+    def _object_exists(self, key: str) -> bool:
+        """Check whether an object exists (HEAD request); errors count as missing."""
+        try:
+            self.client.head_object(Bucket=self.bucket_name, Key=key)
+            return True
+        except ClientError as e:
+            error_code = e.response.get('Error', {}).get('Code', 'Unknown')
+            # 403 is what S3 returns for a missing key without s3:ListBucket
+            if error_code not in ('404', 'NoSuchKey', 'NotFound', '403', 'AccessDenied', 'Forbidden'):
+                logger.warning(f"S3 head_object error ({error_code}) for {key}: {e}")
+            return False
+        except Exception as e:
+            logger.warning(f"Unexpected error checking S3 object {key}: {e}")
+            return False
+    
+    def _upload_if_missing(self, buffer: bytes, key: str, content_type: str) -> Optional[str]:
+        """Upload unless the (content-addressed) key already exists."""
+        if self.client and self._object_exists(key):
+            logger.debug(f"S3 object already exists, skipping upload: {key}")
+            return key
+        return self.upload_file_to_s3(buffer, key, content_type)
+    
     def upload_file_to_s3(
         self,
         buffer: bytes,
@@ -68,18 +140,25 @@ class S3Service:
             return None
         
         try:
-            # Create file-like object from bytes
-            file_obj = io.BytesIO(buffer)
-            
-            # Upload using upload_fileobj (streams directly to S3)
-            self.client.upload_fileobj(
-                file_obj,
-                self.bucket_name,
-                key,
-                ExtraArgs={
-                    'ContentType': content_type
-                }
-            )
+            if len(buffer) < self._transfer_config.multipart_threshold:
+                # Small objects (e.g. extracted images): one PUT, no file-like/transfer machinery
+                self.client.put_object(
+                    Bucket=self.bucket_name,
+                    Key=key,
+                    Body=buffer,
+                    ContentType=content_type
+                )
+            else:
+                # Large objects: multipart upload with parallel parts
+                self.client.upload_fileobj(
+                    io.BytesIO(buffer),
+                    self.bucket_name,
+                    key,
+                    ExtraArgs={
+                        'ContentType': content_type
+                    },
+                    Config=self._transfer_config
+                )
             
             logger.debug(f"Uploaded to S3: {key}")
             return key
@@ -99,20 +178,23 @@ class S3Service:
         """
         return self.get_s3_file_buffer(key)
 
-    def get_s3_file_buffer(
+    def get_s3_streaming_body(
         self,
         key: str,
         bucket_name: str = None
-    ) -> Optional[bytes]:
+    ):
         """
-        Download file from S3 and return as bytes buffer.
+        Open an S3 object for streaming reads.
+        
+        The returned body can be handed straight to stream consumers (e.g. Image.open)
+        without first materializing the object in memory. Callers must close it.
         
         Args:
             key: S3 object key (path/filename)
             bucket_name: Optional bucket name (uses default if not provided)
             
         Returns:
-            Bytes buffer containing the file content, None on failure
+            botocore StreamingBody, None on failure
         """
         if not self.client:
             logger.error("S3 client not initialized")
@@ -121,10 +203,7 @@ class S3Service:
         bucket = bucket_name or self.bucket_name
         
         try:
-            buffer = io.BytesIO()
-            self.client.download_fileobj(bucket, key, buffer)
-            buffer.seek(0)
-            return buffer.read()
+            return self.client.get_object(Bucket=bucket, Key=key)["Body"]
             
         except ClientError as e:
             error_code = e.response.get('Error', {}).get('Code', 'Unknown')
@@ -142,6 +221,85 @@ class S3Service:
         except Exception as e:
             logger.error(f"Unexpected error downloading from S3: {e}")
             return None
+
+    def get_s3_file_buffer(
+        self,
+        key: str,
+        bucket_name: str = None,
+        multipart: bool = False
+    ) -> Optional[bytes]:
+        """
+        Download file from S3 and return as bytes buffer.
+        
+        By default reads the object body with a single GET directly into one bytes
+        object. With multipart=True the download goes through the transfer manager,
+        which fetches objects above the multipart threshold as parallel byte ranges
+        (at the cost of an extra HEAD request, so it is only worth it for large files).
+        
+        Args:
+            key: S3 object key (path/filename)
+            bucket_name: Optional bucket name (uses default if not provided)
+            multipart: Use ranged parallel download for large objects
+            
+        Returns:
+            Bytes buffer containing the file content, None on failure
+        """
+        if multipart:
+            return self._download_with_transfer_manager(key, bucket_name or self.bucket_name)
+        
+        body = self.get_s3_streaming_body(key, bucket_name)
+        if body is None:
+            return None
+        
+        try:
+            return body.read()
+        except Exception as e:
+            logger.error(f"Unexpected error downloading from S3: {e}")
+            return None
+        finally:
+            body.close()
+    
+    def get_s3_file_stream(
+        self,
+        key: str,
+        bucket_name: str = None
+    ) -> Optional[io.BytesIO]:
+        """
+        Download file from S3 into a seekable in-memory stream.
+        
+        Unlike get_s3_file_buffer, the BytesIO is returned as-is (rewound), so
+        consumers that want a file object (e.g. pdfplumber) don't copy it again.
+        Large objects are fetched as parallel byte ranges via the transfer manager.
+        
+        Args:
+            key: S3 object key (path/filename)
+            bucket_name: Optional bucket name (uses default if not provided)
+            
+        Returns:
+            BytesIO positioned at 0, None on failure
+        """
+        if not self.client:
+            logger.error("S3 client not initialized")
+            return None
+        
+        file_obj = io.BytesIO()
+        try:
+            self.client.download_fileobj(bucket_name or self.bucket_name, key, file_obj, Config=self._transfer_config)
+            file_obj.seek(0)
+            return file_obj
+            
+        except ClientError as e:
+            error_code = e.response.get('Error', {}).get('Code', 'Unknown')
+            logger.error(f"S3 download error ({error_code}) for {key}: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"Unexpected error downloading from S3: {e}")
+            return None
+    
+    def _download_with_transfer_manager(self, key: str, bucket: str) -> Optional[bytes]:
+        """Download an object via download_fileobj using the shared transfer config."""
+        stream = self.get_s3_file_stream(key, bucket)
+        return stream.getvalue() if stream else None
     
     def get_public_url(self, key: str) -> str:
         """
@@ -155,21 +313,70 @@ class S3Service:
         """
         return f"https://{self.bucket_name}.s3.{self.region}.amazonaws.com/{key}"
     
+    def presign_public_url(self, url: str, expiration: int = None) -> str:
+        """
+        Convert an Object URL from this bucket into a presigned GET URL.
+        
+        Signing is a local HMAC computation (no network call), so this is cheap
+        enough to run per image when building responses.
+        
+        Args:
+            url: Object URL as returned by get_public_url
+            expiration: URL expiration in seconds (defaults to S3_PRESIGNED_URL_EXPIRE_SECONDS)
+            
+        Returns:
+            Presigned URL, or the original URL if it is not from this bucket
+        """
+        if not self.client or not url:
+            return url
+        
+        prefix = self.get_public_url("")
+        if not url.startswith(prefix):
+            return url
+        
+        presigned = self.generate_presigned_url(
+            url[len(prefix):],
+            expiration or settings.S3_PRESIGNED_URL_EXPIRE_SECONDS
+        )
+        return presigned or url
+    
+    def presign_public_urls(self, urls: List[Optional[str]], expiration: int = None) -> List[Optional[str]]:
+        """
+        Presign a batch of Object URLs (see presign_public_url).
+        
+        Signing is CPU-bound, so callers on the event loop should run the whole
+        batch in one threadpool call rather than per URL.
+        
+        Args:
+            urls: Object URLs as returned by get_public_url
+            expiration: URL expiration in seconds (defaults to S3_PRESIGNED_URL_EXPIRE_SECONDS)
+            
+        Returns:
+            Presigned URLs in the same order as urls
+        """
+        return [self.presign_public_url(url, expiration) for url in urls]
+    
     def upload_image(
         self,
         image_bytes: bytes,
         folder: str = "images",
         filename: str = "image",
-        mime_type: str = "image/png"
+        mime_type: str = "image/png",
+        dedupe: bool = False
     ) -> Optional[dict]:
         """
         Convenience method to upload image bytes with auto-generated key.
         
+        With dedupe, the key is content-addressed and the PUT is skipped when the
+        object already exists (one extra HEAD). Use it only where the same bytes
+        are expected to recur, e.g. re-processing the same PDF.
+        
         Args:
             image_bytes: Raw image bytes
             folder: S3 folder/prefix
             filename: Base filename
             mime_type: Image MIME type
+            dedupe: Reuse an existing object with identical content
             
         Returns:
             Dict with url (Object URL), key and bucket, or None on failure
@@ -183,11 +390,13 @@ class S3Service:
         }
         extension = ext_map.get(mime_type, "png")
         
-        # Generate unique key
-        key = self._generate_key(folder, filename, extension)
-        
-        # Upload
-        result_key = self.upload_file_to_s3(image_bytes, key, mime_type)
+        if not dedupe:
+            key = self._generate_key(folder, filename, extension)
+            result_key = self.upload_file_to_s3(image_bytes, key, mime_type)
+        else:
+            # Content-addressed key: re-processing the same PDF maps to the same objects
+            key = self._generate_key(folder, filename, extension, content=image_bytes)
+            result_key = self._upload_if_missing(image_bytes, key, mime_type)
         
         if result_key:
             # Return simple Object URL (requires bucket policy for public access)
@@ -211,6 +420,41 @@ class S3Service:
             logger.error(f"S3 delete error: {e}")
             return False
     
+    def delete_objects(self, keys: List[str]) -> List[str]:
+        """
+        Delete many objects from S3 with batched DeleteObjects calls.
+        
+        Sends one request per DELETE_BATCH_SIZE (1000, the S3 limit) keys instead
+        of one round-trip per object.
+        
+        Args:
+            keys: S3 object keys to delete
+            
+        Returns:
+            Keys that could not be deleted (empty list on full success)
+        """
+        if not self.client:
+            return list(keys)
+        
+        failed = []
+        for start in range(0, len(keys), DELETE_BATCH_SIZE):
+            batch = keys[start:start + DELETE_BATCH_SIZE]
+            try:
+                response = self.client.delete_objects(
+                    Bucket=self.bucket_name,
+                    Delete={'Objects': [{'Key': key} for key in batch], 'Quiet': True}
+                )
+                # Quiet mode only reports failures
+                for error in response.get('Errors', []):
+                    logger.error(f"S3 delete error for {error.get('Key')}: {error.get('Code')} {error.get('Message')}")
+                    failed.append(error.get('Key'))
+            except ClientError as e:
+                logger.error(f"S3 batch delete error: {e}")
+                failed.extend(batch)
+        
+        logger.debug(f"Deleted {len(keys) - len(failed)} of {len(keys)} objects from S3")
+        return failed
+    
     def generate_presigned_url(
         self,
         key: str,
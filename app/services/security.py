@@ -4,10 +4,12 @@ Security utilities for password hashing, token generation, and verification.
 
 import secrets
 import hashlib
-from typing import Optional
+import hmac
+from typing import List, Optional, Union
 import bcrypt
 from loguru import logger
 from passlib.context import CryptContext
+from app.config import settings
 
 # Fix for passlib incompatibility with bcrypt >= 4.0
 if not hasattr(bcrypt, "__about__"):
@@ -19,8 +21,8 @@ if not hasattr(bcrypt, "__about__"):
         pass
 
 
-# Setup password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Setup password hashing (bcrypt is CPU-bound: call these via run_in_threadpool from async code)
+pwd_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=settings.BCRYPT_ROUNDS, deprecated="auto")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against a hashed password."""
@@ -39,10 +41,27 @@ def generate_opaque_token(length: int = 64) -> str:
     """Generate a secure random string for use as a refresh token."""
     return secrets.token_urlsafe(length)
 
-def get_token_hash(token: str) -> str:
+def get_token_hash(token: str) -> bytes:
     """
     Generate a SHA-256 hash of the token for storage.
     We hash refresh tokens so that even if the DB is compromised, 
     active tokens cannot be used without the cookie.
+    
+    The raw 32-byte digest is stored (BSON binary subtype 0), half the size of hex.
     """
-    return hashlib.sha256(token.encode()).hexdigest()
+    return hashlib.sha256(token.encode()).digest()
+
+def get_token_hash_candidates(token: str) -> List[Union[bytes, str]]:
+    """
+    All stored forms a token's hash may have: the binary digest plus the legacy
+    hex string written before the switch to binary, so existing sessions keep working.
+    """
+    digest = get_token_hash(token)
+    return [digest, digest.hex()]
+
+def token_hash_matches(stored_hash: Union[bytes, str], candidates: List[Union[bytes, str]]) -> bool:
+    """Constant-time check of a stored token hash against the candidate forms."""
+    return any(
+        type(stored_hash) is type(candidate) and hmac.compare_digest(stored_hash, candidate)
+        for candidate in candidates
+    )
@@ -1,5 +1,8 @@
 from fastapi import HTTPException
-from jose import jwt, JWTError
+import hashlib
+import time
+import jwt
+from cachetools import TLRUCache
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 from app.config import settings
@@ -10,6 +13,13 @@ JWT_SECRET_KEY = settings.JWT_SECRET_KEY
 JWT_ALGORITHM = settings.JWT_ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 
+# Verified payloads keyed by token digest; each entry expires with the token's own `exp`
+_verified_tokens = TLRUCache(
+    maxsize=4096,
+    ttu=lambda _key, payload, _now: payload.get("exp", 0),
+    timer=time.time
+)
+
 class JWTAuth:
     @staticmethod
     def create_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -34,7 +44,7 @@ class JWTAuth:
         try:
             payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
             return payload
-        except JWTError as e:
+        except jwt.PyJWTError as e:
             logger.error(f"JWT validation error: {str(e)}")
             raise HTTPException(
                 status_code=403,
@@ -58,8 +68,8 @@ class JWTAuth:
             logger.error("No authorization header found")
             raise HTTPException(status_code=401, detail="Not authenticated")
         
-        logger.debug("Auth header received")
-        logger.debug(f"Auth header (first 20 chars): {auth_header[:20]}...")
+        # Arguments are only formatted when DEBUG is enabled
+        logger.opt(lazy=True).debug("Auth header (first 20 chars): {}...", lambda: auth_header[:20])
         
         scheme = ""
         token = ""
@@ -74,11 +84,36 @@ class JWTAuth:
             logger.error(f"Invalid authentication scheme: {scheme}")
             raise HTTPException(status_code=401, detail="Invalid authentication scheme")
 
-        logger.debug(f"Verifying token: {token[:10]}... (len: {len(token)})")
+        return JWTAuth.verify_bearer_token(token)
+
+    @staticmethod
+    def verify_bearer_token(token: str) -> dict:
+        """Verify an already-extracted Bearer token and return its payload
+        
+        Args:
+            token: The raw JWT (without the "Bearer " prefix)
+            
+        Returns:
+            dict: The token payload
+            
+        Raises:
+            HTTPException: If token is invalid or expired
+        """
+        # Recently verified tokens skip signature verification (keyed by digest, not the raw token)
+        cache_key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+        payload = _verified_tokens.get(cache_key)
+        if payload is not None:
+            # Hand each request its own copy so callers can't mutate the cached entry
+            return dict(payload)
+        
+        logger.opt(lazy=True).debug("Verifying token: {}... (len: {})", lambda: token[:10], lambda: len(token))
         
         try:
             payload = JWTAuth.decrypt_token(token)
             logger.info(f"Token verified successfully for user: {payload.get('user_id')}")
+            
+            if "exp" in payload:
+                _verified_tokens[cache_key] = dict(payload)
                 
             return payload
             
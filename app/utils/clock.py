@@ -0,0 +1,7 @@
+import time
+from datetime import datetime, timezone
+
+
+def now_utc() -> datetime:
+    """Current time as a timezone-aware UTC datetime (replaces deprecated ``utcnow``)."""
+    return datetime.fromtimestamp(time.time(), tz=timezone.utc)
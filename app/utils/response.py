@@ -1,18 +1,45 @@
+import orjson
 from fastapi.responses import JSONResponse
 from fastapi.encoders import jsonable_encoder
 from typing import Any
 from pydantic import BaseModel
+from bson import ObjectId
+
+
+def _json_default(obj: Any) -> Any:
+    # jsonable_encoder has no ObjectId encoder and raises TypeError on it
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    return jsonable_encoder(obj)
+
+
+class APIJSONResponse(JSONResponse):
+    """orjson-backed JSON response used as the app's default response class.
+
+    Naive datetimes (e.g. timestamps read back from Mongo) are emitted
+    with an explicit UTC offset instead of as ambiguous local timestamps.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=_json_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_NAIVE_UTC,
+        )
 
 
 def success_response(data: Any, status_code: int = 200) -> JSONResponse:
-    # jsonable_encoder handles Pydantic models and datetime objects
-    return JSONResponse(
-        content=jsonable_encoder(data),
+    # orjson handles dicts/lists/datetimes natively; models are dumped up front and
+    # anything else goes through _json_default (ObjectId -> str, then jsonable_encoder)
+    if isinstance(data, BaseModel):
+        data = data.model_dump()
+    return APIJSONResponse(
+        content=data,
         status_code=status_code
     )
 
 def error_response(error: str, status_code: int = 400) -> JSONResponse:
-    return JSONResponse(
+    return APIJSONResponse(
         content={"error": error},
         status_code=status_code
     )
\ No newline at end of file
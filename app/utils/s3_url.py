@@ -0,0 +1,40 @@
+"""
+Helpers for parsing S3 Object URLs.
+"""
+
+import re
+from typing import Optional
+from urllib.parse import urlsplit
+
+# Path-style endpoints only: s3.amazonaws.com, s3.<region>.amazonaws.com, s3-<region>.amazonaws.com
+# (a virtual-hosted bucket may itself be named "s3-...", so a prefix check is not enough)
+_PATH_STYLE_HOST = re.compile(r"s3([.-][a-z0-9-]+)?\.amazonaws\.com")
+
+
+def s3_key_from_url(url: str) -> Optional[str]:
+    """
+    Extract the S3 object key from an S3 Object URL.
+    
+    Supports virtual-hosted style (https://bucket.s3.region.amazonaws.com/key)
+    and path style (https://s3.region.amazonaws.com/bucket/key). Query strings
+    (e.g. presigned URL signatures) and fragments are ignored. The key is returned
+    as it appears in the URL, matching get_public_url which embeds raw keys.
+    
+    Returns:
+        The object key, or None if the URL is not an S3 URL
+    """
+    if not url:
+        return None
+    
+    parts = urlsplit(url)
+    host = parts.hostname or ""
+    if not host.endswith(".amazonaws.com"):
+        return None
+    
+    path = parts.path.lstrip("/")
+    
+    # Path style: the first path segment is the bucket
+    if _PATH_STYLE_HOST.fullmatch(host):
+        _, _, path = path.partition("/")
+    
+    return path or None
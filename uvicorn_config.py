@@ -16,6 +16,10 @@ elif ENV == "production":
 else:
     raise ValueError(f"Unknown APP_ENV: {ENV}")
 
+# Each worker also starts its own PDF extraction process pool (PDF_EXTRACT_WORKERS,
+# default cpu count // WEB_CONCURRENCY), so tell the workers how many of them there are
+os.environ["WEB_CONCURRENCY"] = str(workers)
+
 if __name__ == "__main__":
     uvicorn.run(
         "app.main:app",  # Replace with your actual FastAPI app import